@@ -6,115 +6,199 @@ Shows warning notification if Claude's confidence is below user threshold.
 
 import sys
 import re
+import atexit
 import os
 import json
-from datetime import datetime
+import time
+
+# orjson parses and serializes several times faster than the stdlib; fall back when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+# "Confidence: 75%" / "Confidence - 75%" or "75% confident", compiled once at import
+# and matched against lower-cased text
+_CONF_RE = re.compile(
+    r'confidence\s*[:\-]\s*(?P<labelled>\d{1,3})%|(?P<confident>\d{1,3})%\s*confident'
+)
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Indicators used by estimate_confidence, matched against the lower-cased response
+SUCCESS_WORDS = ['successfully', 'completed', 'fixed', 'working', 'done']
+PRECISION_WORDS = ['correct', 'accurate', 'precise', 'exactly']
+CODE_INDICATORS = ['```', 'function', 'class']
+UNCERTAINTY_WORDS = ['might', 'maybe', 'possibly', 'unclear', 'not sure', 'uncertain', 'probably', 'likely']
+HEDGING_WORDS = ['seems', 'appears', 'could be', 'might be', 'should work', 'try']
+
+KEYWORD_CATEGORIES = {
+    'success': SUCCESS_WORDS,
+    'precision': PRECISION_WORDS,
+    'code': CODE_INDICATORS,
+    'uncertainty': UNCERTAINTY_WORDS,
+    'hedging': HEDGING_WORDS
+}
+
+# build_keyword_matcher and extract_text are copies of the ones in text_features.py:
+# this hook is installed on its own as a single file, so it cannot import them
+def build_keyword_matcher(keywords_by_category):
+    """Build a single-pass matcher yielding (keyword, categories) for every keyword hit.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise a
+    lookahead alternation regex so overlapping keywords are still reported.
+    """
+    categories_by_keyword = {}
+    for category, keywords in keywords_by_category.items():
+        for keyword in keywords:
+            categories_by_keyword.setdefault(keyword, []).append(category)
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, categories in categories_by_keyword.items():
+            automaton.add_word(keyword, (keyword, categories))
+        automaton.make_automaton()
+        return lambda text: (value for _, value in automaton.iter(text))
+    
+    # Alternatives are tried longest first, so each match is the longest keyword at
+    # its position; any keywords that are prefixes of it matched there as well
+    keywords = sorted(categories_by_keyword, key=len, reverse=True)
+    hits = {k: [(p, categories_by_keyword[p]) for p in keywords if k.startswith(p)] for k in keywords}
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+    return lambda text: (hit for m in pattern.finditer(text) for hit in hits[m.group(1)])
+
+_match_keywords = build_keyword_matcher(KEYWORD_CATEGORIES)
+
+def scan_keywords(text):
+    """Return the distinct keywords found in lower-cased text, grouped by category"""
+    found = {category: set() for category in KEYWORD_CATEGORIES}
+    for keyword, categories in _match_keywords(text):
+        for category in categories:
+            found[category].add(keyword)
+    return found
 
 # Debug logging
 DEBUG_LOG = os.path.expanduser("~/.claude/clauded-debug.log")
 
-def debug_log(message):
-    try:
-        timestamp = datetime.now().isoformat()
-        with open(DEBUG_LOG, 'a') as f:
-            f.write(f"[NOTIFICATION {timestamp}] {message}\n")
-    except Exception:
-        pass  # Silently fail if we can't write to debug log
+# Debug logging is opt-in so normal hook runs pay nothing for it
+DEBUG_ENABLED = os.environ.get('CLAUDED_DEBUG') == '1'
+
+if DEBUG_ENABLED:
+    # Opened on first use and reused for the life of the hook process
+    _debug_file = None
+
+    def debug_log(message, *args):
+        global _debug_file
+        if _debug_file is None:
+            try:
+                _debug_file = open(DEBUG_LOG, 'a', buffering=1)  # Line-buffered
+                atexit.register(_debug_file.close)
+            except Exception:
+                _debug_file = False  # Don't retry if we can't write to debug log
+        if not _debug_file:
+            return
+        # Arguments are only formatted once we know the line will be written
+        if args:
+            try:
+                message = message % args
+            except Exception:
+                pass  # Log the unformatted message rather than nothing
+        try:
+            timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+            _debug_file.write(f"[NOTIFICATION {timestamp}] {message}\n")
+        except Exception:
+            pass
+else:
+    def debug_log(message, *args):
+        pass
+
+CONFIG_PATH = os.path.expanduser('~/.claude/clauded-config.json')
 
 def get_config():
     """Load clauded configuration for minimum confidence threshold"""
-    config_path = os.path.expanduser('~/.claude/clauded-config.json')
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        with open(CONFIG_PATH, 'rb') as f:
+            config = json_loads(f.read())
             min_confidence = config.get('minConfidence', 50)
-            debug_log(f"Loaded config: min confidence = {min_confidence}%")
+            debug_log("Loaded config: min confidence = %s%%", min_confidence)
             return min_confidence
     except Exception as e:
-        debug_log(f"Could not read config, using default: {str(e)}")
+        debug_log("Could not read config, using default: %s", e)
         return 50  # Default fallback
 
-def extract_confidence_from_response(content):
-    """Extract confidence level from Claude's response"""
-    if not content:
+def extract_text(content):
+    """Flatten message content to a string, keeping only the text blocks"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        # Most messages are a single block, so skip the generator and join for those
+        if len(content) == 1:
+            block = content[0]
+            if isinstance(block, str):
+                return block
+            return block.get('text', '') if isinstance(block, dict) and block.get('type') == 'text' else ''
+        return '\n'.join(
+            block if isinstance(block, str) else block.get('text', '')
+            for block in content
+            if isinstance(block, str) or (isinstance(block, dict) and block.get('type') == 'text')
+        )
+    return str(content)
+
+def extract_confidence_from_response(content_lower):
+    """Extract confidence level from Claude's lower-cased response"""
+    if not content_lower:
         return None
     
-    # Convert to string if needed
-    if isinstance(content, list):
-        # Handle list format - extract text
-        text_parts = []
-        for block in content:
-            if isinstance(block, dict) and block.get('type') == 'text':
-                text_parts.append(block.get('text', ''))
-            elif isinstance(block, str):
-                text_parts.append(block)
-        content = '\n'.join(text_parts)
-    elif not isinstance(content, str):
-        content = str(content)
-    
-    # Look for confidence patterns
-    confidence_patterns = [
-        r'confidence:\s*(\d{1,3})%',  # "Confidence: 75%"
-        r'confidence\s*[:\-]\s*(\d{1,3})%',  # "Confidence - 75%"
-        r'(\d{1,3})%\s*confident',  # "75% confident"
-    ]
-    
-    content_lower = content.lower()
-    for pattern in confidence_patterns:
-        match = re.search(pattern, content_lower)
-        if match:
-            confidence = int(match.group(1))
-            debug_log(f"Found confidence level: {confidence}%")
-            return confidence
+    # Most responses never mention confidence; a substring test rejects them
+    # without running the regex ('confiden' covers both patterns)
+    match = 'confiden' in content_lower and _CONF_RE.search(content_lower)
+    if match:
+        confidence = int(match.group('labelled') or match.group('confident'))
+        debug_log("Found confidence level: %s%%", confidence)
+        return confidence
     
     debug_log("No explicit confidence found in response")
     return None
 
-def estimate_confidence(content, tool_calls):
+def estimate_confidence(content, content_lower, tool_calls):
     """Estimate confidence based on response characteristics if not explicitly stated"""
     if not content:
         return 50  # Default neutral
     
-    # Convert to string if needed
-    if isinstance(content, list):
-        text_parts = []
-        for block in content:
-            if isinstance(block, dict) and block.get('type') == 'text':
-                text_parts.append(block.get('text', ''))
-            elif isinstance(block, str):
-                text_parts.append(block)
-        content = '\n'.join(text_parts)
-    elif not isinstance(content, str):
-        content = str(content)
-    
     score = 50  # Base score
-    content_lower = content.lower()
+    
+    # One pass over the response for every indicator category
+    found = scan_keywords(content_lower)
     
     # Positive indicators
-    if any(word in content_lower for word in ['successfully', 'completed', 'fixed', 'working', 'done']):
+    if found['success']:
         score += 15
     
-    if any(word in content_lower for word in ['correct', 'accurate', 'precise', 'exactly']):
+    if found['precision']:
         score += 10
     
     # Tool usage indicates concrete action
     if len(tool_calls) > 0:
         score += 20
-        debug_log(f"Added 20 points for {len(tool_calls)} tool calls")
+        debug_log("Added 20 points for %s tool calls", len(tool_calls))
     
     # Code examples or specific solutions
-    if '```' in content or 'function' in content_lower or 'class' in content_lower:
+    if found['code']:
         score += 10
     
     # Uncertainty indicators
-    uncertainty_words = ['might', 'maybe', 'possibly', 'unclear', 'not sure', 'uncertain', 'probably', 'likely']
-    uncertainty_count = sum(1 for word in uncertainty_words if word in content_lower)
-    score -= uncertainty_count * 5
+    score -= len(found['uncertainty']) * 5
     
     # Hedging language
-    hedging_words = ['seems', 'appears', 'could be', 'might be', 'should work', 'try']
-    hedging_count = sum(1 for word in hedging_words if word in content_lower)
-    score -= hedging_count * 3
+    score -= len(found['hedging']) * 3
     
     # Very short responses might be less confident
     if len(content) < 50:
@@ -126,35 +210,42 @@ def estimate_confidence(content, tool_calls):
     
     # Clamp to valid range
     score = max(10, min(95, score))
-    debug_log(f"Estimated confidence score: {score}%")
+    debug_log("Estimated confidence score: %s%%", score)
     
     return score
 
 def should_show_warning(content, tool_calls, min_confidence):
     """Determine if we should show a confidence warning"""
     
+    content_lower = content.lower() if content else ''
+    
     # First check for explicit confidence
-    explicit_confidence = extract_confidence_from_response(content)
+    explicit_confidence = extract_confidence_from_response(content_lower)
     if explicit_confidence is not None:
-        debug_log(f"Using explicit confidence: {explicit_confidence}%")
+        debug_log("Using explicit confidence: %s%%", explicit_confidence)
         return explicit_confidence < min_confidence, explicit_confidence
     
     # Estimate confidence if not explicit
-    estimated_confidence = estimate_confidence(content, tool_calls)
-    debug_log(f"Using estimated confidence: {estimated_confidence}%")
+    estimated_confidence = estimate_confidence(content, content_lower, tool_calls)
+    debug_log("Using estimated confidence: %s%%", estimated_confidence)
     
     # Only show warning for significantly low confidence estimates
     # Add a buffer since estimated confidence is less reliable
     warning_threshold = min_confidence - 10
     return estimated_confidence < warning_threshold, estimated_confidence
 
+def emit_output(output):
+    """Write the hook's JSON decision straight to the stdout byte stream"""
+    sys.stdout.buffer.write(json_dumps(output) + b'\n')
+    sys.stdout.buffer.flush()
+
 def main():
     debug_log("=== Confidence notification hook started ===")
     
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        debug_log(f"Received notification data: {list(input_data.keys())}")
+        input_data = json_loads(sys.stdin.buffer.read())
+        debug_log("Received notification data: %s", list(input_data.keys()))
         
         # Extract notification content
         notification = input_data.get('notification', {})
@@ -163,14 +254,17 @@ def main():
         # Extract tool calls if available
         tool_calls = input_data.get('tool_calls', [])
         
-        debug_log(f"Content length: {len(content) if content else 0}")
-        debug_log(f"Tool calls: {len(tool_calls)}")
+        debug_log("Content length: %s", len(content) if content else 0)
+        debug_log("Tool calls: %s", len(tool_calls))
         
         # Skip if no meaningful content
         if not content or (isinstance(content, str) and len(content.strip()) < 10):
             debug_log("No meaningful content, skipping")
             sys.exit(0)
         
+        # Flatten content blocks once for every check below
+        content = extract_text(content)
+        
         # Get minimum confidence threshold
         min_confidence = get_config()
         
@@ -178,7 +272,7 @@ def main():
         should_warn, confidence_level = should_show_warning(content, tool_calls, min_confidence)
         
         if should_warn:
-            debug_log(f"Showing confidence warning: {confidence_level}% < {min_confidence}%")
+            debug_log("Showing confidence warning: %s%% < %s%%", confidence_level, min_confidence)
             
             # Create warning notification
             warning_msg = f"⚠️  Claude's confidence is {confidence_level}% (below your {min_confidence}% threshold). Continue anyway?"
@@ -191,18 +285,18 @@ def main():
                 "default_action": "continue"
             }
             
-            print(json.dumps(output))
+            emit_output(output)
             sys.exit(0)
         else:
-            debug_log(f"Confidence {confidence_level}% meets threshold {min_confidence}%, allowing")
+            debug_log("Confidence %s%% meets threshold %s%%, allowing", confidence_level, min_confidence)
             # Allow notification to proceed normally
             sys.exit(0)
         
     except json.JSONDecodeError as e:
-        debug_log(f"JSON decode error: {str(e)}")
+        debug_log("JSON decode error: %s", e)
         sys.exit(0)
     except Exception as e:
-        debug_log(f"Unexpected error: {str(e)}")
+        debug_log("Unexpected error: %s", e)
         sys.exit(0)
 
 if __name__ == "__main__":
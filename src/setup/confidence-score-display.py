@@ -6,59 +6,100 @@ This hook analyzes the assistant's response and displays a confidence score.
 
 import sys
 import re
+import atexit
+import functools
 import os
 import json
-from datetime import datetime
+import time
+
+# orjson parses several times faster than the stdlib; fall back when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+from text_features import estimate_tokens, extract_text, iter_lines_reversed
+
+# Patterns compiled once at import rather than on every hook run
+_CONFIDENCE_RE = re.compile(r'confidence:\s*(\d{1,3})%', re.IGNORECASE)
+_HAS_CONFIDENCE_RE = re.compile(r'confidence:\s*\d+%', re.IGNORECASE)
+
+# Keyword categories, each scanned case-insensitively in a single regex pass over the response
+SUCCESS_WORDS = ('successfully', 'completed', 'fixed', 'working')
+ERROR_WORDS = ('error', 'failed', 'issue', 'problem')
+UNCERTAINTY_WORDS = ('might', 'maybe', 'possibly', 'unclear', 'not sure', 'uncertain')
+CODE_INDICATORS = {'```': 'code blocks', 'function': 'functions', 'class': 'classes'}
+# Matched case-sensitively against the original response
+TOOL_PATTERNS = ('<function_calls>', '<invoke>', 'Read', 'Write', 'Edit', 'Bash')
+
+def _keyword_re(words):
+    return re.compile('|'.join(map(re.escape, words)), re.IGNORECASE)
+
+_SUCCESS_RE = _keyword_re(SUCCESS_WORDS)
+_ERROR_RE = _keyword_re(ERROR_WORDS)
+_UNCERTAINTY_RE = _keyword_re(UNCERTAINTY_WORDS)
+_CODE_RE = re.compile('|'.join(map(re.escape, CODE_INDICATORS)), re.IGNORECASE)
+_TOOL_RE = re.compile('|'.join(map(re.escape, TOOL_PATTERNS)))
+
+def find_keywords(pattern, words, text):
+    """Return the keywords matched by pattern in text, in declaration order"""
+    found = set(pattern.findall(text))
+    if pattern.flags & re.IGNORECASE:
+        found = {m.lower() for m in found}
+    return [w for w in words if w in found]
 
 # Debug logging
 DEBUG_LOG = os.path.expanduser("~/.claude/clauded-debug.log")
 
-def debug_log(message):
-    try:
-        timestamp = datetime.now().isoformat()
-        with open(DEBUG_LOG, 'a') as f:
-            f.write(f"[{timestamp}] {message}\n")
-    except Exception:
-        pass  # Silently fail if we can't write to debug log
+# Debug logging is opt-in so normal hook runs pay nothing for it
+DEBUG_ENABLED = os.environ.get('CLAUDED_DEBUG') == '1'
+
+if DEBUG_ENABLED:
+    from datetime import datetime
+    
+    # Opened on first use and reused for the life of the hook process
+    _debug_file = None
+    
+    def debug_log(message):
+        global _debug_file
+        if _debug_file is None:
+            try:
+                _debug_file = open(DEBUG_LOG, 'a', buffering=1)  # Line-buffered
+                atexit.register(_debug_file.close)
+            except Exception:
+                _debug_file = False  # Don't retry if we can't write to debug log
+        if not _debug_file:
+            return
+        try:
+            timestamp = datetime.now().isoformat()
+            _debug_file.write(f"[{timestamp}] {message}\n")
+        except Exception:
+            pass  # Silently fail if we can't write to debug log
+else:
+    def debug_log(message):
+        pass
 
 def get_last_assistant_response(transcript_path):
     debug_log(f"Reading transcript from: {transcript_path}")
     try:
-        with open(transcript_path, 'r') as f:
-            lines = f.readlines()
-        
-        debug_log(f"Transcript has {len(lines)} lines")
-        
-        # Find the last assistant message
-        for line in reversed(lines):
+        # Find the last assistant message, scanning from the end of the file
+        for line in iter_lines_reversed(transcript_path):
+            # Cheap bytes check so only assistant entries pay for a JSON parse
+            if b'"type":"assistant"' not in line and b'"type": "assistant"' not in line:
+                continue
             try:
-                entry = json.loads(line.strip())
+                entry = json_loads(line)
                 if (entry.get('type') == 'assistant' and 
                     entry.get('message', {}).get('role') == 'assistant'):
                     content = entry.get('message', {}).get('content', '')
                     if content:
                         debug_log("Found assistant response with content")
                         # Handle both string and list formats - always return string
-                        if isinstance(content, list):
-                            # Extract text from list of content blocks
-                            text_parts = []
-                            for block in content:
-                                if isinstance(block, dict) and block.get('type') == 'text':
-                                    text_parts.append(block.get('text', ''))
-                                elif isinstance(block, str):
-                                    text_parts.append(block)
-                            result = '\n'.join(text_parts)
-                            debug_log(f"Extracted text from list content: {len(result)} chars")
-                            return result if result else None
-                        elif isinstance(content, str):
-                            debug_log(f"Found string content: {len(content)} chars")
-                            return content
-                        else:
-                            # Convert any other type to string
-                            result = str(content)
-                            debug_log(f"Converted content to string: {len(result)} chars")
-                            return result
-            except json.JSONDecodeError:
+                        result = extract_text(content)
+                        debug_log(f"Extracted text from content: {len(result)} chars")
+                        return result if result else None
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 continue
         
         debug_log("No valid assistant response found")
@@ -67,30 +108,36 @@ def get_last_assistant_response(transcript_path):
         debug_log(f"Error reading transcript: {str(e)}")
         return None
 
+@functools.lru_cache(maxsize=8)
+def load_config_file(config_path, mtime_ns):
+    """Parse the config file; cached per modification time so edits are picked up"""
+    with open(config_path, 'rb') as f:
+        return json_loads(f.read())
+
 def get_config():
     """Load configuration settings"""
     config_path = os.path.expanduser('~/.claude/clauded-config.json')
     default_config = {'minConfidence': 50, 'verbose': True}
     
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-            # Ensure all required keys exist
-            for key, default_value in default_config.items():
-                if key not in config:
-                    config[key] = default_value
-            return config
+        mtime_ns = os.stat(config_path).st_mtime_ns
+        # Copy so callers can't mutate the cached entry
+        config = dict(load_config_file(config_path, mtime_ns))
+        # Ensure all required keys exist
+        for key, default_value in default_config.items():
+            if key not in config:
+                config[key] = default_value
+        return config
     except Exception as e:
         debug_log(f"Could not read config, using defaults: {str(e)}")
         return default_config
 
-def calculate_confidence_score(response, verbose_mode=True):
+def calculate_confidence_score(response, config):
     """Calculate confidence score based on response characteristics"""
     debug_log("Calculating confidence score")
     
-    # Load user's configuration
-    config = get_config()
     min_confidence = config.get('minConfidence', 50)
+    verbose_mode = config.get('verbose', True)
     
     if verbose_mode:
         debug_log(f"User confidence threshold: {min_confidence}%")
@@ -102,46 +149,49 @@ def calculate_confidence_score(response, verbose_mode=True):
     reasoning = []
     
     # Check for explicit confidence statements
-    confidence_pattern = r'confidence:\s*(\d{1,3})%'
-    confidence_match = re.search(confidence_pattern, response.lower())
+    confidence_match = _CONFIDENCE_RE.search(response)
     if confidence_match:
         explicit_confidence = int(confidence_match.group(1))
         debug_log(f"Found explicit confidence: {explicit_confidence}%")
         reasoning.append("Explicit confidence statement found")
         return explicit_confidence, reasoning
     
-    # Analyze response characteristics
-    response_lower = response.lower()
+    # Uncertainty indicators, checked first because they still apply to short responses
+    uncertainty_words = find_keywords(_UNCERTAINTY_RE, UNCERTAINTY_WORDS, response)
+    
+    # Short responses carry too little signal to be worth the positive indicator scans
+    if len(response) < 100:
+        if uncertainty_words:
+            score -= 20
+            reasoning.append(f"Uncertainty words: {', '.join(uncertainty_words)}")
+            debug_log("Reduced 20 points for uncertainty indicators")
+        reasoning.append(f"Short response ({len(response)} chars)")
+        debug_log("Reduced 10 points for short response, skipping positive indicators")
+        return max(10, score - 10), reasoning
     
+    # Analyze response characteristics
     # Positive indicators
-    success_words = [w for w in ['successfully', 'completed', 'fixed', 'working'] if w in response_lower]
+    success_words = find_keywords(_SUCCESS_RE, SUCCESS_WORDS, response)
     if success_words:
         score += 15
         reasoning.append(f"Success indicators: {', '.join(success_words)}")
         debug_log("Added 15 points for success indicators")
     
-    error_handling = [w for w in ['error', 'failed', 'issue', 'problem'] if w in response_lower]
+    error_handling = find_keywords(_ERROR_RE, ERROR_WORDS, response)
     if error_handling:
         score += 10  # Finding/handling errors shows competence
         reasoning.append(f"Error handling mentioned: {', '.join(error_handling)}")
         debug_log("Added 10 points for error handling")
     
     # Tool usage indicates concrete action
-    tool_patterns = ['<function_calls>', '<invoke>', 'Read', 'Write', 'Edit', 'Bash']
-    tools_used = [p for p in tool_patterns if p in response]
+    tools_used = find_keywords(_TOOL_RE, TOOL_PATTERNS, response)
     if tools_used:
         score += 20
         reasoning.append(f"Used tools: {', '.join(tools_used)}")
         debug_log("Added 20 points for tool usage")
     
     # Code examples or specific solutions
-    code_indicators = []
-    if '```' in response:
-        code_indicators.append("code blocks")
-    if 'function' in response_lower:
-        code_indicators.append("functions")
-    if 'class' in response_lower:
-        code_indicators.append("classes")
+    code_indicators = [CODE_INDICATORS[k] for k in find_keywords(_CODE_RE, CODE_INDICATORS, response)]
     
     if code_indicators:
         score += 15
@@ -149,18 +199,13 @@ def calculate_confidence_score(response, verbose_mode=True):
         debug_log("Added 15 points for code examples")
     
     # Uncertainty indicators
-    uncertainty_words = [w for w in ['might', 'maybe', 'possibly', 'unclear', 'not sure', 'uncertain'] if w in response_lower]
     if uncertainty_words:
         score -= 20
         reasoning.append(f"Uncertainty words: {', '.join(uncertainty_words)}")
         debug_log("Reduced 20 points for uncertainty indicators")
     
     # Response length analysis
-    if len(response) < 100:
-        score -= 10
-        reasoning.append(f"Short response ({len(response)} chars)")
-        debug_log("Reduced 10 points for short response")
-    elif len(response) > 1000:
+    if len(response) > 1000:
         score += 10
         reasoning.append(f"Detailed response ({len(response)} chars)")
         debug_log("Added 10 points for detailed response")
@@ -172,11 +217,11 @@ def calculate_confidence_score(response, verbose_mode=True):
     return score, reasoning
 
 def main():
-    start_time = datetime.now()
+    start_ns = time.monotonic_ns()
     debug_log("=== Confidence score display started (Stop hook) ===")
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        input_data = json_loads(sys.stdin.buffer.read())
         debug_log(f"Received input data: {list(input_data.keys())}")
         
         # Extract transcript path
@@ -195,30 +240,21 @@ def main():
         
         debug_log(f"Analyzing response of {len(response)} characters")
         
-        # Check if this response already has a confidence score
-        if 'confidence:' in response.lower() and '%' in response:
-            debug_log("Response already contains confidence score, skipping")
+        # Cheapest filters first: skip if response is too short to be meaningful,
+        # which also covers one-word replies like "ok" or "thanks"
+        stripped = response.strip()
+        if len(stripped) < 20:
+            debug_log("Response too short for confidence scoring")
             sys.exit(0)
         
-        # Check if this is a meaningful response that warrants a confidence score
-        response_lower = response.lower()
-        
-        # Skip trivial responses
-        trivial_patterns = [
-            r'^(yes|no)\.?$',
-            r'^(ok|okay)\.?$',
-            r'^(thanks?|thank you)\.?$',
-            r'^[^a-zA-Z]*$'  # Only punctuation/numbers
-        ]
-        
-        for pattern in trivial_patterns:
-            if re.match(pattern, response_lower.strip()):
-                debug_log("Detected trivial response, skipping confidence score")
-                sys.exit(0)
+        # Skip responses with only punctuation/numbers
+        if not any(c.isalpha() for c in stripped):
+            debug_log("Detected trivial response, skipping confidence score")
+            sys.exit(0)
         
-        # Skip if response is too short to be meaningful
-        if len(response.strip()) < 20:
-            debug_log("Response too short for confidence scoring")
+        # Check if this response already has a confidence score
+        if _HAS_CONFIDENCE_RE.search(response):
+            debug_log("Response already contains confidence score, skipping")
             sys.exit(0)
         
         # Get configuration for verbose mode
@@ -226,7 +262,7 @@ def main():
         verbose_mode = config.get('verbose', True)
         
         # Calculate confidence score
-        confidence_score, reasoning = calculate_confidence_score(response, verbose_mode)
+        confidence_score, reasoning = calculate_confidence_score(response, config)
         
         debug_log(f"Calculated confidence score: {confidence_score}%")
         debug_log(f"Response length: {len(response)} characters")
@@ -241,13 +277,11 @@ def main():
                 confidence_display = f"\n\n🎯 Confidence: {confidence_score}% 🎯\n"
             
             # Calculate performance metrics
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds() * 1000
+            processing_time = (time.monotonic_ns() - start_ns) / 1e6
             
             # Add performance info and estimated token impact
             perf_info = f"⏱️ Hook processing: {processing_time:.1f}ms"
-            token_estimate = len(response.split()) * 1.3  # Rough token estimate
-            cost_info = f"📊 Est. tokens analyzed: ~{int(token_estimate)}"
+            cost_info = f"📊 Est. tokens analyzed: ~{estimate_tokens(response)}"
             
             confidence_display_with_perf = confidence_display.rstrip() + f"\n{perf_info} | {cost_info}\n"
         else:
@@ -5,19 +5,103 @@ PostToolUse hook for Claude Code - detects suggestions and requests confidence e
 
 import sys
 import re
+import atexit
 import os
 import json
 from datetime import datetime
 
+# orjson parses and serializes several times faster than the stdlib; fall back when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+from text_features import build_keyword_matcher, extract_text, group_keyword_hits
+
+# Patterns compiled once at import rather than on every hook run
+_HAS_CONFIDENCE_RE = re.compile(r'confidence:\s*\d+%', re.IGNORECASE)
+
+# HIGH RISK: Operations that can cause data loss or system changes
+HIGH_RISK_TOOLS = [
+    'edit', 'write', 'multiedit', 'delete', 'bash', 'remove', 'move',
+    'notebookedit', 'rm ', 'mv ', 'cp -f'
+]
+
+# MEDIUM RISK: Operations that change state but are recoverable
+MEDIUM_RISK_TOOLS = [
+    'webfetch', 'task', 'commit', 'push', 'git '
+]
+
+# LOW RISK: Read-only operations
+LOW_RISK_TOOLS = [
+    'read', 'grep', 'glob', 'ls', 'notebookread'
+]
+
+# Keywords that indicate suggestions or recommendations
+SUGGESTION_KEYWORDS = [
+    'suggest', 'recommend', 'should', 'could', 'would', 'consider',
+    'improve', 'fix', 'change', 'update', 'modify', 'implement',
+    'propose', 'add', 'remove', 'replace', 'refactor', 'optimize'
+]
+
+RISK_CATEGORIES = {
+    'high_risk_tool': HIGH_RISK_TOOLS,
+    'medium_risk_tool': MEDIUM_RISK_TOOLS,
+    'low_risk_tool': LOW_RISK_TOOLS,
+    'suggestion': SUGGESTION_KEYWORDS
+}
+
+_match_risk = build_keyword_matcher(RISK_CATEGORIES, ignore_case=True)
+
+# Tool name words for O(1) lookup of tool calls; entries containing spaces are
+# command fragments that only make sense in the response text scan
+HIGH_RISK_TOOL_NAMES = frozenset(t for t in HIGH_RISK_TOOLS if ' ' not in t)
+MEDIUM_RISK_TOOL_NAMES = frozenset(t for t in MEDIUM_RISK_TOOLS if ' ' not in t)
+LOW_RISK_TOOL_NAMES = frozenset(t for t in LOW_RISK_TOOLS if ' ' not in t)
+
+def tool_name_words(tool_name):
+    """Split a lower-cased tool name into the words looked up in the risk sets.
+
+    MCP tools are named mcp__<server>__<tool>, so only the part after the last
+    '__' is used, split on '_' and '-': 'mcp__fs__write_file' gives
+    {'write', 'file'} while 'todowrite' stays a single word.
+    """
+    return set(tool_name.rsplit('__', 1)[-1].replace('-', '_').split('_'))
+
 # Debug logging
 DEBUG_LOG = os.path.expanduser("~/.claude/clauded-debug.log")
 
-def debug_log(message):
-    try:
-        timestamp = datetime.now().isoformat()
-        with open(DEBUG_LOG, 'a') as f:
-            f.write(f"[SCORER {timestamp}] {message}\n")
-    except Exception:
+# Debug logging is opt-in so normal hook runs pay nothing for it
+DEBUG_ENABLED = os.environ.get('CLAUDED_DEBUG') == '1'
+# Full payload dumps are large, so they need their own opt-in on top of CLAUDED_DEBUG
+DEBUG_FULL_INPUT = DEBUG_ENABLED and os.environ.get('CLAUDED_DEBUG_FULL') == '1'
+
+if DEBUG_ENABLED:
+    # Opened on first use and reused for the life of the hook process
+    _debug_file = None
+    
+    def debug_log(message):
+        global _debug_file
+        if _debug_file is None:
+            try:
+                _debug_file = open(DEBUG_LOG, 'a', buffering=1)  # Line-buffered
+                atexit.register(_debug_file.close)
+            except Exception:
+                _debug_file = False  # Don't retry if we can't write to debug log
+        if not _debug_file:
+            return
+        try:
+            timestamp = datetime.now().isoformat()
+            _debug_file.write(f"[SCORER {timestamp}] {message}\n")
+        except Exception:
+            pass
+else:
+    def debug_log(message):
         pass
 
 def analyze_operation_risk(response_content, tool_calls):
@@ -28,39 +112,22 @@ def analyze_operation_risk(response_content, tool_calls):
     if not isinstance(response_content, str):
         response_content = str(response_content)
     
-    response_lower = response_content.lower()
-    
-    # HIGH RISK: Operations that can cause data loss or system changes
-    high_risk_tools = [
-        'edit', 'write', 'multiedit', 'delete', 'bash', 'remove', 'move',
-        'notebookedit', 'rm ', 'mv ', 'cp -f'
-    ]
-    
-    # MEDIUM RISK: Operations that change state but are recoverable
-    medium_risk_tools = [
-        'webfetch', 'task', 'commit', 'push', 'git '
-    ]
-    
-    # LOW RISK: Read-only operations
-    low_risk_tools = [
-        'read', 'grep', 'glob', 'ls', 'notebookread'
-    ]
-    
-    # Check for high-risk operations
-    high_risk_count = sum(1 for tool in high_risk_tools if tool in response_lower)
-    medium_risk_count = sum(1 for tool in medium_risk_tools if tool in response_lower)
-    low_risk_count = sum(1 for tool in low_risk_tools if tool in response_lower)
+    # Check for risky operations and suggestions in a single case-insensitive pass
+    found = group_keyword_hits(_match_risk(response_content), RISK_CATEGORIES)
+    high_risk_count = len(found['high_risk_tool'])
+    medium_risk_count = len(found['medium_risk_tool'])
+    low_risk_count = len(found['low_risk_tool'])
     
     # Also check actual tool calls for risk assessment
     tool_call_risk = 'none'
     for tool_call in tool_calls:
-        tool_name = tool_call.get('function', {}).get('name', '').lower()
-        if any(risky in tool_name for risky in high_risk_tools):
+        words = tool_name_words(tool_call.get('function', {}).get('name', '').lower())
+        if not HIGH_RISK_TOOL_NAMES.isdisjoint(words):
             tool_call_risk = 'high'
             break
-        elif any(medium in tool_name for medium in medium_risk_tools):
+        elif not MEDIUM_RISK_TOOL_NAMES.isdisjoint(words):
             tool_call_risk = 'medium'
-        elif tool_call_risk == 'none' and any(low in tool_name for low in low_risk_tools):
+        elif tool_call_risk == 'none' and not LOW_RISK_TOOL_NAMES.isdisjoint(words):
             tool_call_risk = 'low'
     
     # Determine overall risk level
@@ -72,12 +139,7 @@ def analyze_operation_risk(response_content, tool_calls):
         risk_level = 'low'
     else:
         # Check for suggestion keywords for non-tool responses
-        suggestion_keywords = [
-            'suggest', 'recommend', 'should', 'could', 'would', 'consider',
-            'improve', 'fix', 'change', 'update', 'modify', 'implement',
-            'propose', 'add', 'remove', 'replace', 'refactor', 'optimize'
-        ]
-        has_suggestions = any(keyword in response_lower for keyword in suggestion_keywords)
+        has_suggestions = bool(found['suggestion'])
         risk_level = 'low' if has_suggestions else 'none'
     
     debug_log(f"Risk assessment: {risk_level} (high:{high_risk_count}, medium:{medium_risk_count}, low:{low_risk_count}, tool_risk:{tool_call_risk})")
@@ -89,14 +151,20 @@ def analyze_operation_risk(response_content, tool_calls):
         'tool_call_risk': tool_call_risk
     }
 
+def emit_output(output):
+    """Write the hook's JSON decision straight to the stdout byte stream"""
+    sys.stdout.buffer.write(json_dumps(output) + b'\n')
+    sys.stdout.buffer.flush()
+
 def main():
     debug_log("=== Confidence scorer started (PostToolUse) ===")
     
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        input_data = json_loads(sys.stdin.buffer.read())
         debug_log(f"Received input: {list(input_data.keys())}")
-        debug_log(f"Full input data structure: {json.dumps(input_data, indent=2)}")
+        if DEBUG_FULL_INPUT:
+            debug_log(f"Full input data structure: {json.dumps(input_data, indent=2)}")
         
         # Extract response and tool calls - try multiple possible locations
         response = input_data.get('response', {})
@@ -110,14 +178,7 @@ def main():
         debug_log(f"Direct tool info: name='{tool_name}', input_keys={list(tool_input.keys()) if isinstance(tool_input, dict) else 'not_dict'}")
         
         # Get response content
-        response_content = response.get('content', '')
-        if isinstance(response_content, list):
-            # Handle list format - extract text
-            text_parts = []
-            for block in response_content:
-                if isinstance(block, dict) and block.get('type') == 'text':
-                    text_parts.append(block.get('text', ''))
-            response_content = '\n'.join(text_parts)
+        response_content = extract_text(response.get('content', ''))
         
         debug_log(f"Response content length: {len(response_content)}")
         debug_log(f"Tool calls count: {len(tool_calls)}")
@@ -132,12 +193,9 @@ def main():
             sys.exit(0)
         
         # Check if confidence already exists in response
-        has_confidence = False
-        if has_response_content:
-            has_confidence = re.search(r'confidence:\s*\d+%', response_content.lower())
-            if has_confidence:
-                debug_log("Confidence already present in response, skipping")
-                sys.exit(0)
+        if has_response_content and _HAS_CONFIDENCE_RE.search(response_content):
+            debug_log("Confidence already present in response, skipping")
+            sys.exit(0)
         
         # Analyze operation risk level using both response content and direct tool info
         if has_direct_tool:
@@ -163,7 +221,7 @@ def main():
                 "decision": "block", 
                 "reason": f"🎯 **MANDATORY CONFIDENCE REQUIRED**\n\nThis operation involves high-risk changes (file edits, system commands, deletions).\n\n**Please add explicit confidence to your response:**\n`Confidence: X% - [your reasoning]`\n\n**Then submit your response again.**"
             }
-            print(json.dumps(output))
+            emit_output(output)
             sys.exit(1)
             
         elif risk_level == 'medium':
@@ -175,7 +233,7 @@ def main():
                 "decision": "approve",
                 "reason": confidence_request
             }
-            print(json.dumps(output))
+            emit_output(output)
             sys.exit(0)
             
         else:  # risk_level == 'low'
@@ -187,7 +245,7 @@ def main():
                 "decision": "approve",
                 "reason": confidence_request
             }
-            print(json.dumps(output))
+            emit_output(output)
             sys.exit(0)
         
     except Exception as e:
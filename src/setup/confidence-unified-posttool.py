@@ -6,154 +6,101 @@ This consolidates confidence-scorer.py and confidence-notification-hook.py for b
 
 import sys
 import re
+import atexit
 import os
 import json
-from datetime import datetime
+import time
+
+# orjson parses and serializes several times faster than the stdlib; fall back when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+# Patterns compiled once at import rather than on every hook run
+_CONF_RE = re.compile(r'confidence:\s*(\d{1,3})%', re.IGNORECASE)
 
 # Debug logging
 DEBUG_LOG = os.path.expanduser("~/.claude/clauded-debug.log")
 
-def debug_log(message):
-    try:
-        timestamp = datetime.now().isoformat()
-        with open(DEBUG_LOG, 'a') as f:
-            f.write(f"[UNIFIED-POSTTOOL {timestamp}] {message}\n")
-    except Exception:
+# Debug logging is opt-in so normal hook runs pay nothing for it
+DEBUG_ENABLED = os.environ.get('CLAUDED_DEBUG') == '1'
+
+if DEBUG_ENABLED:
+    # Opened on first use and reused for the life of the hook process
+    _debug_file = None
+
+    def debug_log(message, *args):
+        global _debug_file
+        if _debug_file is None:
+            try:
+                _debug_file = open(DEBUG_LOG, 'a', buffering=1)  # Line-buffered
+                atexit.register(_debug_file.close)
+            except Exception:
+                _debug_file = False  # Don't retry if we can't write to debug log
+        if not _debug_file:
+            return
+        # Arguments are only formatted once we know the line will be written
+        if args:
+            try:
+                message = message % args
+            except Exception:
+                pass  # Log the unformatted message rather than nothing
+        try:
+            timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+            _debug_file.write(f"[UNIFIED-POSTTOOL {timestamp}] {message}\n")
+        except Exception:
+            pass
+else:
+    def debug_log(message, *args):
         pass
 
 # Import shared config cache
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-import importlib.util
-spec = importlib.util.spec_from_file_location("config_cache", os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-cache.py"))
-config_cache = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(config_cache)
-get_cached_config = config_cache.get_cached_config
-get_min_confidence = config_cache.get_min_confidence
-get_verbose_mode = config_cache.get_verbose_mode
-
-def get_config():
-    """Load configuration settings with caching"""
-    return get_cached_config()
+from config_cache import get_cached_config
+from text_features import ANALYSIS_SUCCESS_WORDS, ANALYSIS_UNCERTAINTY_WORDS, analyze, extract_text, iter_lines_reversed
 
 def get_last_assistant_response(transcript_path):
     """Extract the last assistant response from transcript"""
-    debug_log(f"Reading transcript from: {transcript_path}")
+    debug_log("Reading transcript from: %s", transcript_path)
     try:
-        with open(transcript_path, 'r') as f:
-            lines = f.readlines()
-        
-        debug_log(f"Transcript has {len(lines)} lines")
-        
-        # Find the last assistant message
-        for line in reversed(lines):
+        # Find the last assistant message, scanning from the end of the file
+        for line in iter_lines_reversed(transcript_path):
+            # Cheap bytes check so only assistant entries pay for a JSON parse
+            if b'"type":"assistant"' not in line and b'"type": "assistant"' not in line:
+                continue
             try:
-                entry = json.loads(line.strip())
+                entry = json_loads(line)
                 if (entry.get('type') == 'assistant' and 
                     entry.get('message', {}).get('role') == 'assistant'):
                     content = entry.get('message', {}).get('content', '')
                     if content:
                         debug_log("Found assistant response with content")
                         # Handle both string and list formats - always return string
-                        if isinstance(content, list):
-                            # Extract text from list of content blocks
-                            text_parts = []
-                            for block in content:
-                                if isinstance(block, dict) and block.get('type') == 'text':
-                                    text_parts.append(block.get('text', ''))
-                                elif isinstance(block, str):
-                                    text_parts.append(block)
-                            result = '\n'.join(text_parts)
-                            debug_log(f"Extracted text from list content: {len(result)} chars")
-                            return result if result else None
-                        elif isinstance(content, str):
-                            debug_log(f"Found string content: {len(content)} chars")
-                            return content
-                        else:
-                            # Convert any other type to string
-                            result = str(content)
-                            debug_log(f"Converted content to string: {len(result)} chars")
-                            return result
-            except json.JSONDecodeError:
+                        result = extract_text(content)
+                        debug_log("Extracted text from content: %s chars", len(result))
+                        return result if result else None
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 continue
         
         debug_log("No valid assistant response found")
         return None
     except Exception as e:
-        debug_log(f"Error reading transcript: {str(e)}")
+        debug_log("Error reading transcript: %s", e)
         return None
 
-def contains_suggestions(response_content, tool_calls):
-    """Check if response contains suggestions, recommendations, or code changes"""
-    debug_log(f"Analyzing response with {len(tool_calls)} tool calls")
-    
-    # Convert to string if needed
-    if not isinstance(response_content, str):
-        response_content = str(response_content)
-    
-    response_lower = response_content.lower()
-    
-    # Keywords that indicate suggestions or recommendations
-    suggestion_keywords = [
-        'suggest', 'recommend', 'should', 'could', 'would', 'consider',
-        'improve', 'fix', 'change', 'update', 'modify', 'implement',
-        'propose', 'add', 'remove', 'replace', 'refactor', 'optimize'
-    ]
-    
-    # Tool call patterns that indicate code changes
-    tool_call_patterns = [
-        'edit', 'write', 'create', 'delete', 'move', 'copy',
-        'function_calls', 'antml:invoke', 'tool_calls'
-    ]
-    
-    # Check for suggestion keywords
-    has_suggestions = any(keyword in response_lower for keyword in suggestion_keywords)
-    
-    # Check for tool calls (actual code changes)
-    has_tool_calls = len(tool_calls) > 0
-    
-    # Check for tool call patterns in text
-    has_tool_patterns = any(pattern in response_lower for pattern in tool_call_patterns)
-    
-    debug_log(f"Has suggestions: {has_suggestions}, Has tool calls: {has_tool_calls}, Has tool patterns: {has_tool_patterns}")
-    
-    return has_suggestions or has_tool_calls or has_tool_patterns
-
-def assess_risk_level(response_content, tool_calls):
-    """Assess the risk level of the operations being performed"""
-    high_risk_keywords = [
-        'delete', 'remove', 'rm ', 'unlink', 'drop', 'truncate',
-        'format', 'wipe', 'destroy', 'kill', 'terminate',
-        'sudo', 'chmod', 'chown', 'mv ', 'move'
-    ]
-    
-    medium_risk_keywords = [
-        'edit', 'modify', 'change', 'update', 'replace',
-        'install', 'config', 'settings', 'deploy'
-    ]
-    
-    response_lower = response_content.lower() if response_content else ""
-    
-    # Check for high-risk operations
-    if any(keyword in response_lower for keyword in high_risk_keywords):
-        return 'high'
-    
-    # Check for medium-risk operations
-    if any(keyword in response_lower for keyword in medium_risk_keywords):
-        return 'medium'
-    
-    # Check tool calls for risk
-    if len(tool_calls) > 3:  # Many tool calls = higher risk
-        return 'medium'
-    
-    return 'low'
-
-def estimate_confidence(response_content, tool_calls, config):
+def estimate_confidence(char_count, features, tool_calls, config):
     """Estimate confidence when explicit confidence is missing"""
     debug_log("Estimating confidence based on response analysis")
     
-    if not response_content:
+    if not char_count:
         return 50  # Neutral default
     
     score = 60  # Base score for responses with content
@@ -161,63 +108,83 @@ def estimate_confidence(response_content, tool_calls, config):
     # Tool usage indicates concrete action
     if len(tool_calls) > 0:
         score += 15
-        debug_log(f"Added 15 points for {len(tool_calls)} tool calls")
+        debug_log("Added 15 points for %s tool calls", len(tool_calls))
     
     # Response characteristics
-    response_lower = response_content.lower()
+    found = features.keywords
     
     # Positive indicators
-    if any(word in response_lower for word in ['successfully', 'completed', 'working', 'fixed']):
+    if found['success']:
         score += 10
     
     # Uncertainty indicators
-    if any(word in response_lower for word in ['might', 'maybe', 'possibly', 'not sure']):
+    if found['uncertainty']:
         score -= 15
     
     # Length consideration
-    if len(response_content) > 500:
+    if char_count > 500:
         score += 5  # Detailed responses
-    elif len(response_content) < 50:
+    elif char_count < 50:
         score -= 10  # Very short responses
     
     # Clamp to reasonable range
     score = max(30, min(85, score))
-    debug_log(f"Estimated confidence: {score}%")
+    debug_log("Estimated confidence: %s%%", score)
     
     return score
 
+# Only the approve message varies between runs, so the rest of each payload is encoded once
+_APPROVE_PREFIX = b'{"decision":"approve","append_message":'
+_BLOCK_OUTPUT = json_dumps({
+    "decision": "block",
+    "reason": "🎯 **MANDATORY CONFIDENCE REQUIRED**\n\nThis operation involves high-risk changes (file edits, system commands, deletions).\n\n**Please add explicit confidence to your response:**\n`Confidence: X% - [your reasoning]`\n\n**Then submit your response again.**"
+}) + b'\n'
+
+def emit_output(payload):
+    """Write pre-encoded JSON straight to the stdout byte stream"""
+    sys.stdout.buffer.write(payload)
+    sys.stdout.buffer.flush()
+
 def main():
     debug_log("=== Unified PostToolUse hook started ===")
     
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        debug_log(f"Received input: {list(input_data.keys())}")
-        debug_log(f"Full input data: {input_data}")
+        input_data = json_loads(sys.stdin.buffer.read())
+        debug_log("Received input: %s", list(input_data.keys()))
         
-        # Get configuration
-        config = get_config()
+        # Resolve configuration once for the whole run
+        config = get_cached_config()
         min_confidence = config.get('minConfidence', 50)
+        verbose = config.get('verbose', True)
         
         # PostToolUse hook gets individual tool info, not full tool_calls array
         tool_name = input_data.get('tool_name', '')
         tool_calls = [{'name': tool_name}] if tool_name else []
-        debug_log(f"Single tool call detected: {tool_name}")
+        debug_log("Single tool call detected: %s", tool_name)
+        
+        # Use the response when the hook input carries it inline
+        message = input_data.get('message')
+        response_content = input_data.get('response') or (
+            message.get('content') if isinstance(message, dict) else None
+        )
+        response_content = extract_text(response_content) if isinstance(response_content, (str, list)) else ""
+        if response_content:
+            debug_log("Using inline response content: %s chars", len(response_content))
         
-        # PostToolUse hook doesn't get response content directly
-        # Need to read it from the transcript
+        # Otherwise read it from the transcript
         transcript_path = input_data.get('transcript_path')
-        response_content = ""
         
-        if transcript_path:
+        if not response_content and transcript_path:
             response_content = get_last_assistant_response(transcript_path)
-            debug_log(f"Extracted response from transcript: {len(response_content) if response_content else 0} chars")
+            debug_log("Extracted response from transcript: %s chars", len(response_content) if response_content else 0)
         
         if not response_content:
             response_content = ""
         
-        debug_log(f"Response content length: {len(response_content)}")
-        debug_log(f"Tool calls count: {len(tool_calls)}")
+        char_count = len(response_content)
+        debug_log("Response content length: %s", char_count)
+        debug_log("Tool calls count: %s", len(tool_calls))
         
         # Skip if no meaningful content
         if not response_content.strip():
@@ -225,7 +192,7 @@ def main():
             sys.exit(0)
         
         # Check if confidence already exists
-        if re.search(r'confidence:\s*\d+%', response_content.lower()):
+        if _CONF_RE.search(response_content):
             debug_log("Confidence already present, skipping")
             sys.exit(0)
         
@@ -234,20 +201,24 @@ def main():
         
         debug_log("Suggestions/changes detected, proceeding with analysis")
         
+        response_lower = response_content.lower()
+        
+        # Scan the response once for everything below
+        features = analyze(response_lower, len(tool_calls))
+        
         # Assess risk level
-        risk_level = assess_risk_level(response_content, tool_calls)
-        debug_log(f"Assessed risk level: {risk_level}")
+        risk_level = features.risk_level
+        debug_log("Assessed risk level: %s", risk_level)
         
         # Estimate confidence for all responses
-        estimated_confidence = estimate_confidence(response_content, tool_calls, config)
-        debug_log(f"Estimated confidence: {estimated_confidence}%")
+        estimated_confidence = estimate_confidence(char_count, features, tool_calls, config)
+        debug_log("Estimated confidence: %s%%", estimated_confidence)
         
         # Create confidence display message with verbose details
         confidence_msg = f"🎯 Confidence: {estimated_confidence}% 🎯"
         
-        # Add verbose reasoning - always enabled by default
-        verbose = get_verbose_mode()
-        if True:  # Force verbose mode to always be on
+        # Add verbose reasoning - enabled by default
+        if verbose:
             # Detailed analysis of why this confidence score
             analysis = []
             
@@ -260,12 +231,9 @@ def main():
                 analysis.append(f"ACTIONS: No tools used - this is just conversational response, harder to verify (0%)")
             
             # How certain does my language sound?
-            response_lower = response_content.lower()
-            uncertainty_words = ['might', 'maybe', 'possibly', 'not sure', 'unclear', 'probably']
-            success_words = ['successfully', 'completed', 'working', 'fixed', 'done', 'finished']
-            
-            uncertainty_found = [w for w in uncertainty_words if w in response_lower]
-            success_found = [w for w in success_words if w in response_lower]
+            found = features.keywords
+            uncertainty_found = [w for w in ANALYSIS_UNCERTAINTY_WORDS if w in found['analysis_uncertainty']]
+            success_found = [w for w in ANALYSIS_SUCCESS_WORDS if w in found['analysis_success']]
             
             if uncertainty_found:
                 analysis.append(f"LANGUAGE: Used hedging words ({', '.join(uncertainty_found)}) - shows I'm not fully certain (-15%)")
@@ -275,7 +243,6 @@ def main():
                 analysis.append(f"LANGUAGE: Neutral language - no strong confidence indicators (0%)")
             
             # How much detail did I provide?
-            char_count = len(response_content)
             if char_count > 500:
                 analysis.append(f"DETAIL: Long response ({char_count} chars) - more explanation usually means more thought (+5%)")
             elif char_count < 50:
@@ -302,8 +269,8 @@ def main():
                 interpretation = "LOW CONFIDENCE: High chance of errors, definitely double-check"
             
             confidence_msg += f"\n\n{interpretation}\n" + "\n".join(analysis)
-            debug_log(f"Analysis items: {len(analysis)}, verbose: {verbose}")
-            debug_log(f"Final confidence_msg length: {len(confidence_msg)}")
+            debug_log("Analysis items: %s, verbose: %s", len(analysis), verbose)
+            debug_log("Final confidence_msg length: %s", len(confidence_msg))
         
         # Add risk level if medium/high
         if risk_level in ['medium', 'high']:
@@ -311,24 +278,15 @@ def main():
         
         # For high-risk operations with low confidence, still block
         if risk_level == 'high' and estimated_confidence < min_confidence:
-            output = {
-                "decision": "block",
-                "reason": f"🎯 **MANDATORY CONFIDENCE REQUIRED**\n\nThis operation involves high-risk changes (file edits, system commands, deletions).\n\n**Please add explicit confidence to your response:**\n`Confidence: X% - [your reasoning]`\n\n**Then submit your response again.**"
-            }
-            print(json.dumps(output))
+            emit_output(_BLOCK_OUTPUT)
             sys.exit(1)
         
         # Standard approval with confidence display
-        output = {
-            "decision": "approve",
-            "append_message": confidence_msg
-        }
-        
-        print(json.dumps(output))
+        emit_output(_APPROVE_PREFIX + json_dumps(confidence_msg) + b'}\n')
         sys.exit(0)
         
     except Exception as e:
-        debug_log(f"Error in unified PostToolUse hook: {str(e)}")
+        debug_log("Error in unified PostToolUse hook: %s", e)
         # Fail gracefully - don't block the response
         sys.exit(0)
 
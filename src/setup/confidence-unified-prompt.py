@@ -6,91 +6,123 @@ This consolidates confidence-validator.py and confidence-score-display.py for be
 
 import sys
 import re
+import atexit
 import os
 import json
-from datetime import datetime
+import time
+
+# orjson parses several times faster than the stdlib; fall back when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Patterns compiled once at import rather than on every hook run, matched against lower-cased text
+_CONF_RE = re.compile(r'confidence:\s*(\d{1,3})%')
 
 # Debug logging
 DEBUG_LOG = os.path.expanduser("~/.claude/clauded-debug.log")
 
-def debug_log(message):
-    try:
-        timestamp = datetime.now().isoformat()
-        with open(DEBUG_LOG, 'a') as f:
-            f.write(f"[UNIFIED-PROMPT {timestamp}] {message}\n")
-    except Exception:
-        pass  # Silently fail if we can't write to debug log
+# Debug logging is opt-in so normal hook runs pay nothing for it
+DEBUG_ENABLED = os.environ.get('CLAUDED_DEBUG') == '1'
+
+if DEBUG_ENABLED:
+    # Opened on first use and reused for the life of the hook process
+    _debug_file = None
+
+    def debug_log(message, *args):
+        global _debug_file
+        if _debug_file is None:
+            try:
+                _debug_file = open(DEBUG_LOG, 'a', buffering=1)  # Line-buffered
+                atexit.register(_debug_file.close)
+            except Exception:
+                _debug_file = False  # Don't retry if we can't write to debug log
+        if not _debug_file:
+            return
+        # Arguments are only formatted once we know the line will be written
+        if args:
+            try:
+                message = message % args
+            except Exception:
+                pass  # Log the unformatted message rather than nothing
+        try:
+            timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+            _debug_file.write(f"[UNIFIED-PROMPT {timestamp}] {message}\n")
+        except Exception:
+            pass
+else:
+    def debug_log(message, *args):
+        pass
 
 # Import shared config cache
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-import importlib.util
-spec = importlib.util.spec_from_file_location("config_cache", os.path.join(os.path.dirname(os.path.abspath(__file__)), "config-cache.py"))
-config_cache = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(config_cache)
-get_cached_config = config_cache.get_cached_config
-get_min_confidence = config_cache.get_min_confidence
-get_verbose_mode = config_cache.get_verbose_mode
+from config_cache import get_cached_config
+from text_features import build_keyword_matcher, estimate_tokens, extract_text, group_keyword_hits, iter_lines_reversed
+
+# Indicators matched against the lower-cased response
+SUCCESS_WORDS = ['successfully', 'completed', 'fixed', 'working']
+ERROR_WORDS = ['error', 'failed', 'issue', 'problem']
+UNCERTAINTY_WORDS = ['might', 'maybe', 'possibly', 'unclear', 'not sure', 'uncertain']
+CODE_WORDS = {'function': 'functions', 'class': 'classes'}
 
-def get_config():
-    """Load configuration settings with caching"""
-    return get_cached_config()
+WORD_CATEGORIES = {
+    'success': SUCCESS_WORDS,
+    'error': ERROR_WORDS,
+    'uncertainty': UNCERTAINTY_WORDS,
+    'code': list(CODE_WORDS)
+}
+
+# Case-sensitive markers matched against the original response
+TOOL_PATTERNS = ['<function_calls>', '<invoke>', 'Read', 'Write', 'Edit', 'Bash']
+CODE_BLOCK_MARKER = '```'
+
+MARKER_CATEGORIES = {
+    'tool': TOOL_PATTERNS,
+    'code_block': [CODE_BLOCK_MARKER]
+}
+
+_match_words = build_keyword_matcher(WORD_CATEGORIES)
+_match_markers = build_keyword_matcher(MARKER_CATEGORIES)
 
 def get_last_assistant_response(transcript_path):
-    debug_log(f"Reading transcript from: {transcript_path}")
+    debug_log("Reading transcript from: %s", transcript_path)
     try:
-        with open(transcript_path, 'r') as f:
-            lines = f.readlines()
-        
-        debug_log(f"Transcript has {len(lines)} lines")
-        
-        # Find the last assistant message
-        for line in reversed(lines):
+        # Find the last assistant message, scanning from the end of the file
+        for line in iter_lines_reversed(transcript_path):
+            # Cheap bytes check so only assistant entries pay for a JSON parse
+            if b'"type":"assistant"' not in line and b'"type": "assistant"' not in line:
+                continue
             try:
-                entry = json.loads(line.strip())
+                entry = json_loads(line)
                 if (entry.get('type') == 'assistant' and 
                     entry.get('message', {}).get('role') == 'assistant'):
                     content = entry.get('message', {}).get('content', '')
                     if content:
                         debug_log("Found assistant response with content")
                         # Handle both string and list formats - always return string
-                        if isinstance(content, list):
-                            # Extract text from list of content blocks
-                            text_parts = []
-                            for block in content:
-                                if isinstance(block, dict) and block.get('type') == 'text':
-                                    text_parts.append(block.get('text', ''))
-                                elif isinstance(block, str):
-                                    text_parts.append(block)
-                            result = '\n'.join(text_parts)
-                            debug_log(f"Extracted text from list content: {len(result)} chars")
-                            return result if result else None
-                        elif isinstance(content, str):
-                            debug_log(f"Found string content: {len(content)} chars")
-                            return content
-                        else:
-                            # Convert any other type to string
-                            result = str(content)
-                            debug_log(f"Converted content to string: {len(result)} chars")
-                            return result
-            except json.JSONDecodeError:
+                        result = extract_text(content)
+                        debug_log("Extracted text from content: %s chars", len(result))
+                        return result if result else None
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 continue
         
         debug_log("No valid assistant response found")
         return None
     except Exception as e:
-        debug_log(f"Error reading transcript: {str(e)}")
+        debug_log("Error reading transcript: %s", e)
         return None
 
-def validate_confidence(response, config):
+def validate_confidence(response_lower, config):
     """Validate confidence levels against user requirements"""
-    if not response:
+    if not response_lower:
         return True, None  # No validation needed
     
     # Check for confidence statement in the required format
-    confidence_pattern = r'confidence:\s*(\d{1,3})%'
-    confidence_match = re.search(confidence_pattern, response.lower())
+    confidence_match = _CONF_RE.search(response_lower)
     
     if not confidence_match:
         return True, None  # No confidence statement, allow prompt
@@ -99,7 +131,7 @@ def validate_confidence(response, config):
     confidence_pct = int(confidence_match.group(1))
     min_confidence = config.get('minConfidence', 50)
     
-    debug_log(f"Found confidence {confidence_pct}%, threshold {min_confidence}%")
+    debug_log("Found confidence %s%%, threshold %s%%", confidence_pct, min_confidence)
     
     if confidence_pct < min_confidence:
         message = f"⚠️ 🎯 Claude's confidence is {confidence_pct}% (below your {min_confidence}% threshold). Continue anyway?"
@@ -112,7 +144,7 @@ def validate_confidence(response, config):
     
     return True, None
 
-def calculate_confidence_score(response, config):
+def calculate_confidence_score(response, response_lower, config):
     """Calculate confidence score based on response characteristics"""
     debug_log("Calculating confidence score")
     
@@ -123,80 +155,76 @@ def calculate_confidence_score(response, config):
         return 50, ["No response content provided"]  # Default neutral confidence
     
     score = 50  # Base score
-    reasoning = []
+    reasoning = []  # Only shown, and so only built, in verbose mode
     
     # Check for explicit confidence statements
-    confidence_pattern = r'confidence:\s*(\d{1,3})%'
-    confidence_match = re.search(confidence_pattern, response.lower())
+    confidence_match = _CONF_RE.search(response_lower)
     if confidence_match:
         explicit_confidence = int(confidence_match.group(1))
-        debug_log(f"Found explicit confidence: {explicit_confidence}%")
+        debug_log("Found explicit confidence: %s%%", explicit_confidence)
         reasoning.append("Explicit confidence statement found")
         return explicit_confidence, reasoning
     
-    # Analyze response characteristics
-    response_lower = response.lower()
+    # Analyze response characteristics, one pass each over the lowered and original text
+    words = group_keyword_hits(_match_words(response_lower), WORD_CATEGORIES)
+    markers = group_keyword_hits(_match_markers(response), MARKER_CATEGORIES)
     
     # Positive indicators
-    success_words = [w for w in ['successfully', 'completed', 'fixed', 'working'] if w in response_lower]
-    if success_words:
+    if words['success']:
         score += 15
-        reasoning.append(f"Success indicators: {', '.join(success_words)}")
+        if verbose_mode:
+            reasoning.append(f"Success indicators: {', '.join(w for w in SUCCESS_WORDS if w in words['success'])}")
         debug_log("Added 15 points for success indicators")
     
-    error_handling = [w for w in ['error', 'failed', 'issue', 'problem'] if w in response_lower]
-    if error_handling:
+    if words['error']:
         score += 10  # Finding/handling errors shows competence
-        reasoning.append(f"Error handling mentioned: {', '.join(error_handling)}")
+        if verbose_mode:
+            reasoning.append(f"Error handling mentioned: {', '.join(w for w in ERROR_WORDS if w in words['error'])}")
         debug_log("Added 10 points for error handling")
     
     # Tool usage indicates concrete action
-    tool_patterns = ['<function_calls>', '<invoke>', 'Read', 'Write', 'Edit', 'Bash']
-    tools_used = [p for p in tool_patterns if p in response]
-    if tools_used:
+    if markers['tool']:
         score += 20
-        reasoning.append(f"Used tools: {', '.join(tools_used)}")
+        if verbose_mode:
+            reasoning.append(f"Used tools: {', '.join(p for p in TOOL_PATTERNS if p in markers['tool'])}")
         debug_log("Added 20 points for tool usage")
     
     # Code examples or specific solutions
-    code_indicators = []
-    if '```' in response:
-        code_indicators.append("code blocks")
-    if 'function' in response_lower:
-        code_indicators.append("functions")
-    if 'class' in response_lower:
-        code_indicators.append("classes")
-    
-    if code_indicators:
+    if markers['code_block'] or words['code']:
         score += 15
-        reasoning.append(f"Technical content: {', '.join(code_indicators)}")
+        if verbose_mode:
+            code_indicators = ["code blocks"] if markers['code_block'] else []
+            code_indicators += [label for word, label in CODE_WORDS.items() if word in words['code']]
+            reasoning.append(f"Technical content: {', '.join(code_indicators)}")
         debug_log("Added 15 points for code examples")
     
     # Uncertainty indicators
-    uncertainty_words = [w for w in ['might', 'maybe', 'possibly', 'unclear', 'not sure', 'uncertain'] if w in response_lower]
-    if uncertainty_words:
+    if words['uncertainty']:
         score -= 20
-        reasoning.append(f"Uncertainty words: {', '.join(uncertainty_words)}")
+        if verbose_mode:
+            reasoning.append(f"Uncertainty words: {', '.join(w for w in UNCERTAINTY_WORDS if w in words['uncertainty'])}")
         debug_log("Reduced 20 points for uncertainty indicators")
     
     # Response length analysis
     if len(response) < 100:
         score -= 10
-        reasoning.append(f"Short response ({len(response)} chars)")
+        if verbose_mode:
+            reasoning.append(f"Short response ({len(response)} chars)")
         debug_log("Reduced 10 points for short response")
     elif len(response) > 1000:
         score += 10
-        reasoning.append(f"Detailed response ({len(response)} chars)")
+        if verbose_mode:
+            reasoning.append(f"Detailed response ({len(response)} chars)")
         debug_log("Added 10 points for detailed response")
     
     # Clamp to valid range
     score = max(10, min(95, score))
-    debug_log(f"Final calculated confidence score: {score}% (user threshold: {min_confidence}%)")
+    debug_log("Final calculated confidence score: %s%% (user threshold: %s%%)", score, min_confidence)
     
     return score, reasoning
 
 def main():
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     debug_log("=== Unified UserPromptSubmit hook started ===")
     
     # Always show something - even before any processing
@@ -205,11 +233,11 @@ def main():
     
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
-        debug_log(f"Received input data: {list(input_data.keys())}")
+        input_data = json_loads(sys.stdin.buffer.read())
+        debug_log("Received input data: %s", list(input_data.keys()))
         
         # Get configuration
-        config = get_config()
+        config = get_cached_config()
         
         # Extract transcript path
         transcript_path = input_data.get('transcript_path')
@@ -217,7 +245,7 @@ def main():
             debug_log("No transcript path provided, allowing prompt")
             sys.exit(0)  # No transcript, allow prompt
         
-        debug_log(f"Processing transcript: {transcript_path}")
+        debug_log("Processing transcript: %s", transcript_path)
         
         # Read the last assistant response from transcript
         response = get_last_assistant_response(transcript_path)
@@ -225,67 +253,56 @@ def main():
             debug_log("No response found in transcript, allowing prompt")
             sys.exit(0)  # No response found, allow prompt
         
-        debug_log(f"Analyzing response of {len(response)} characters")
+        debug_log("Analyzing response of %s characters", len(response))
+        
+        # Lower-case once for both the validation and the scoring below
+        response_lower = response.lower()
         
         # First, validate confidence if present
-        is_valid, validation_output = validate_confidence(response, config)
+        is_valid, validation_output = validate_confidence(response_lower, config)
         if not is_valid:
             debug_log("Confidence validation failed, prompting user")
             print(json.dumps(validation_output))
             sys.exit(1)
         
-        # Check if this is a meaningful response that warrants a confidence score
-        response_lower = response.lower()
-        
         # Only skip completely empty responses
         if len(response.strip()) < 3:
             debug_log("Response too short for confidence scoring")
             sys.exit(0)
         
         # Calculate and display confidence score
-        confidence_score, reasoning = calculate_confidence_score(response, config)
+        confidence_score, reasoning = calculate_confidence_score(response, response_lower, config)
         
-        debug_log(f"Calculated confidence score: {confidence_score}%")
+        debug_log("Calculated confidence score: %s%%", confidence_score)
         
         # Format confidence display based on verbose mode
         verbose_mode = config.get('verbose', True)
         
         if verbose_mode:
             # Full verbose output with reasoning and performance
-            if reasoning:
-                reasoning_text = " • " + "\n • ".join(reasoning)
-                confidence_display = f"\n\n🎯 Confidence: {confidence_score}% 🎯\nBased on: {reasoning_text}\n"
-            else:
-                confidence_display = f"\n\n🎯 Confidence: {confidence_score}% 🎯\n"
+            reasoning_text = ("\nBased on:  • " + "\n • ".join(reasoning)) if reasoning else ""
             
             # Calculate performance metrics
-            end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds() * 1000
+            processing_time = (time.perf_counter() - start_time) * 1000
             
             # Add performance info and estimated token impact
             perf_info = f"⏱️ Hook processing: {processing_time:.1f}ms"
-            token_estimate = len(response.split()) * 1.3  # Rough token estimate
-            cost_info = f"📊 Est. tokens analyzed: ~{int(token_estimate)}"
+            cost_info = f"📊 Est. tokens analyzed: ~{estimate_tokens(response)}"
             
-            confidence_display_with_perf = confidence_display.rstrip() + f"\n{perf_info} | {cost_info}\n"
+            confidence_display_with_perf = f"\n\n🎯 Confidence: {confidence_score}% 🎯{reasoning_text}\n{perf_info} | {cost_info}\n"
         else:
             # Minimal output - just confidence score
             confidence_display_with_perf = f"\n\n🎯 Confidence: {confidence_score}% 🎯\n"
         
         # Use simple print to append to response output
         print(confidence_display_with_perf)
-        debug_log(f"Displayed confidence score (verbose: {verbose_mode}) with performance")
+        debug_log("Displayed confidence score (verbose: %s) with performance", verbose_mode)
         
         sys.exit(0)
     
     except Exception as e:
         # Always show something - even if analysis fails
-        debug_log(f"Error in analysis, showing fallback: {str(e)}")
-        print("\n\n🎯 Claude was here 🎯\n")
-        sys.exit(0)
-
-    except json.JSONDecodeError as e:
-        debug_log(f"JSON decode error: {str(e)}")
+        debug_log("Error in analysis, showing fallback: %s", e)
         print("\n\n🎯 Claude was here 🎯\n")
         sys.exit(0)
 
@@ -6,72 +6,187 @@ Based on the working examples from claude-code-hooks-mastery repository.
 
 import sys
 import re
+import atexit
+import functools
 import os
 import json
+from collections import namedtuple
 from datetime import datetime
 
+# orjson parses and serializes several times faster than the stdlib; fall back when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+from text_features import build_keyword_matcher, extract_text, group_keyword_hits, iter_lines_reversed
+
+# Patterns compiled once at import rather than on every hook run
+_CONF_RE = re.compile(r'confidence:\s*(\d{1,3})%', re.IGNORECASE)
+_NUMBERED_LIST_RE = re.compile(r'^[0-9]+\.', re.MULTILINE)
+
+# Single-word language indicators, looked up in the set of response tokens
+SUCCESS_WORDS = frozenset(['successfully', 'completed', 'fixed', 'working', 'done', 'resolved'])
+PRECISION_WORDS = frozenset(['exactly', 'precisely', 'specifically', 'correct', 'accurate'])
+STRONG_UNCERTAINTY_WORDS = frozenset(['unclear', 'uncertain'])
+HEDGING_WORDS = frozenset(['might', 'maybe', 'possibly', 'probably', 'likely', 'seems', 'appears'])
+ERROR_WORDS = frozenset(['error', 'issue', 'problem', 'failed', 'broken'])
+SOLUTION_WORDS = frozenset(['fix', 'solve', 'resolve', 'correct'])
+
+LANGUAGE_WORD_CATEGORIES = {
+    'success': SUCCESS_WORDS,
+    'precision': PRECISION_WORDS,
+    'strong_uncertainty': STRONG_UNCERTAINTY_WORDS,
+    'hedging': HEDGING_WORDS,
+    'error': ERROR_WORDS,
+    'solution': SOLUTION_WORDS
+}
+
+# Multi-word language indicators, matched against the lower-cased response
+STRONG_SUCCESS_PHRASES = ['successfully completed', 'working correctly', 'fixed the issue', 'problem solved']
+STRONG_UNCERTAINTY_PHRASES = ['not sure', 'i think', 'i believe', 'i assume']
+HEDGING_PHRASES = ['should work', 'could be', 'might be', 'try this', 'attempt to']
+
+LANGUAGE_PHRASE_CATEGORIES = {
+    'strong_success': STRONG_SUCCESS_PHRASES,
+    'strong_uncertainty': STRONG_UNCERTAINTY_PHRASES,
+    'hedging': HEDGING_PHRASES
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+# A word also matches tokens it starts, so 'errors' and 'fixed' count as 'error'
+# and 'fix'; tokens are cut to each of these lengths before the set lookups
+_WORD_LENGTHS = sorted({len(word) for words in LANGUAGE_WORD_CATEGORIES.values() for word in words})
+
+# Responses shorter than this are scored without scanning them at all
+SHORT_RESPONSE_LEN = 30
+# Only this many leading characters of pathologically long responses are scored
+MAX_SCORED_CHARS = 50000
+
+# Tool names, matched case-sensitively against the original response
+SAFE_TOOLS = ['Read', 'LS', 'Grep', 'Glob']
+MEDIUM_TOOLS = ['Bash', 'WebFetch']
+RISKY_TOOLS = ['Edit', 'Write', 'MultiEdit']
+
+TOOL_CATEGORIES = {
+    'safe': SAFE_TOOLS,
+    'medium': MEDIUM_TOOLS,
+    'risky': RISKY_TOOLS
+}
+
+_match_phrases = build_keyword_matcher(LANGUAGE_PHRASE_CATEGORIES)
+_match_tools = build_keyword_matcher(TOOL_CATEGORIES)
+
 # Debug logging
 DEBUG_LOG = os.path.expanduser("~/.claude/clauded-debug.log")
 
-def debug_log(message):
-    try:
-        timestamp = datetime.now().isoformat()
-        with open(DEBUG_LOG, 'a') as f:
-            f.write(f"[{timestamp}] {message}\n")
-    except Exception:
-        pass  # Silently fail if we can't write to debug log
+# Debug logging is opt-in so normal hook runs pay nothing for it
+DEBUG_ENABLED = os.environ.get('CLAUDED_DEBUG') == '1'
 
-def estimate_confidence(response):
-    """Sophisticated confidence estimation based on multiple factors"""
-    if not response:
-        return 35  # Default low-neutral
+if DEBUG_ENABLED:
+    # Opened on first use and reused for the life of the hook process
+    _debug_file = None
+
+    def debug_log(message):
+        global _debug_file
+        if _debug_file is None:
+            try:
+                _debug_file = open(DEBUG_LOG, 'a', buffering=1)  # Line-buffered
+                atexit.register(_debug_file.close)
+            except Exception:
+                _debug_file = False  # Don't retry if we can't write to debug log
+        if not _debug_file:
+            return
+        try:
+            timestamp = datetime.now().isoformat()
+            _debug_file.write(f"[{timestamp}] {message}\n")
+        except Exception:
+            pass
+else:
+    def debug_log(message):
+        pass
+
+ConfidenceFeatures = namedtuple('ConfidenceFeatures', [
+    'length', 'strong_success', 'success', 'precision',
+    'safe_tools', 'medium_tools', 'risky_tools',
+    'strong_uncertainty', 'hedging', 'questions', 'errors', 'solutions',
+    'code_blocks', 'numbered_list'
+])
+
+def extract_features(response, response_lower):
+    """Count the confidence indicators in a response"""
+    # Tokenize once and look single words up in sets; phrases and tool names
+    # each take one matcher pass instead of one substring search per keyword
+    tokens = set(_TOKEN_RE.findall(response_lower))
+    stems = {token[:length] for token in tokens for length in _WORD_LENGTHS}
+    language = group_keyword_hits(_match_phrases(response_lower), LANGUAGE_PHRASE_CATEGORIES)
+    for category, words in LANGUAGE_WORD_CATEGORIES.items():
+        language.setdefault(category, set()).update(words & stems)
+    tools = group_keyword_hits(_match_tools(response), TOOL_CATEGORIES)
     
+    return ConfidenceFeatures(
+        length=len(response),
+        strong_success=len(language['strong_success']),
+        success=len(language['success']),
+        precision=len(language['precision']),
+        safe_tools=len(tools['safe']),
+        medium_tools=len(tools['medium']),
+        risky_tools=len(tools['risky']),
+        strong_uncertainty=len(language['strong_uncertainty']),
+        hedging=len(language['hedging']),
+        questions=response.count('?'),
+        errors=len(language['error']),
+        solutions=len(language['solution']),
+        code_blocks=response.count('```'),
+        numbered_list=_NUMBERED_LIST_RE.search(response) is not None
+    )
+
+def score_features(features):
+    """Turn counted confidence indicators into a score; no text is touched here"""
     # Start with conservative base score
     score = 35
-    response_lower = response.lower()
     debug_log(f"Starting with base score: {score}%")
     
     # === POSITIVE INDICATORS ===
     
     # Strong success indicators (contextual)
-    strong_success = ['successfully completed', 'working correctly', 'fixed the issue', 'problem solved']
-    if any(phrase in response_lower for phrase in strong_success):
+    if features.strong_success:
         score += 20
         debug_log("Added 20 points for strong success indicators")
     
     # Moderate success indicators
-    success_words = ['successfully', 'completed', 'fixed', 'working', 'done', 'resolved']
-    success_count = sum(1 for word in success_words if word in response_lower)
+    success_count = features.success
     if success_count > 0:
         # Diminishing returns for multiple success words
         score += min(success_count * 8, 15)
         debug_log(f"Added {min(success_count * 8, 15)} points for {success_count} success indicators")
     
     # Precision indicators
-    precision_words = ['exactly', 'precisely', 'specifically', 'correct', 'accurate']
-    if any(word in response_lower for word in precision_words):
+    if features.precision:
         score += 8
         debug_log("Added 8 points for precision indicators")
     
     # === TOOL USAGE (Risk-weighted) ===
     
     # Low-risk tools
-    safe_tools = ['Read', 'LS', 'Grep', 'Glob']
-    safe_tool_count = sum(1 for tool in safe_tools if tool in response)
+    safe_tool_count = features.safe_tools
     if safe_tool_count > 0:
         score += min(safe_tool_count * 5, 10)
         debug_log(f"Added {min(safe_tool_count * 5, 10)} points for {safe_tool_count} safe tools")
     
     # Medium-risk tools
-    medium_tools = ['Bash', 'WebFetch']
-    medium_tool_count = sum(1 for tool in medium_tools if tool in response)
+    medium_tool_count = features.medium_tools
     if medium_tool_count > 0:
         score += min(medium_tool_count * 8, 15)
         debug_log(f"Added {min(medium_tool_count * 8, 15)} points for {medium_tool_count} medium-risk tools")
     
     # High-risk tools
-    risky_tools = ['Edit', 'Write', 'MultiEdit']
-    risky_tool_count = sum(1 for tool in risky_tools if tool in response)
+    risky_tool_count = features.risky_tools
     if risky_tool_count > 0:
         # High-risk tools are confident actions but also dangerous
         score += min(risky_tool_count * 6, 12)
@@ -80,33 +195,26 @@ def estimate_confidence(response):
     # === NEGATIVE INDICATORS ===
     
     # Strong uncertainty indicators
-    strong_uncertainty = ['not sure', 'unclear', 'uncertain', 'i think', 'i believe', 'i assume']
-    strong_uncertainty_count = sum(1 for phrase in strong_uncertainty if phrase in response_lower)
+    strong_uncertainty_count = features.strong_uncertainty
     if strong_uncertainty_count > 0:
         score -= strong_uncertainty_count * 12
         debug_log(f"Reduced {strong_uncertainty_count * 12} points for strong uncertainty")
     
     # Hedging language (more comprehensive)
-    hedging_phrases = [
-        'might', 'maybe', 'possibly', 'probably', 'likely', 'should work',
-        'seems', 'appears', 'could be', 'might be', 'try this', 'attempt to'
-    ]
-    hedging_count = sum(1 for phrase in hedging_phrases if phrase in response_lower)
+    hedging_count = features.hedging
     if hedging_count > 0:
         score -= hedging_count * 6
         debug_log(f"Reduced {hedging_count * 6} points for {hedging_count} hedging phrases")
     
     # Question marks indicate uncertainty
-    question_count = response.count('?')
+    question_count = features.questions
     if question_count > 0:
         score -= min(question_count * 4, 12)
         debug_log(f"Reduced {min(question_count * 4, 12)} points for {question_count} questions")
     
     # Error/problem indicators without solutions
-    error_words = ['error', 'issue', 'problem', 'failed', 'broken']
-    solution_words = ['fix', 'solve', 'resolve', 'correct']
-    error_count = sum(1 for word in error_words if word in response_lower)
-    solution_count = sum(1 for word in solution_words if word in response_lower)
+    error_count = features.errors
+    solution_count = features.solutions
     
     if error_count > solution_count:
         score -= (error_count - solution_count) * 8
@@ -115,24 +223,24 @@ def estimate_confidence(response):
     # === CONTEXTUAL FACTORS ===
     
     # Response length analysis
-    if len(response) < 30:
+    if features.length < SHORT_RESPONSE_LEN:
         score -= 15
         debug_log("Reduced 15 points for very short response")
-    elif len(response) < 100:
+    elif features.length < 100:
         score -= 8
         debug_log("Reduced 8 points for short response")
-    elif len(response) > 1000:
+    elif features.length > 1000:
         score += 8
         debug_log("Added 8 points for detailed response")
     
     # Code examples indicate concrete solutions
-    code_blocks = response.count('```')
+    code_blocks = features.code_blocks
     if code_blocks > 0:
         score += min(code_blocks * 6, 15)
         debug_log(f"Added {min(code_blocks * 6, 15)} points for {code_blocks} code blocks")
     
     # Numbered lists or structured responses show organization
-    if re.search(r'^[0-9]+\.', response, re.MULTILINE):
+    if features.numbered_list:
         score += 5
         debug_log("Added 5 points for structured numbered response")
     
@@ -144,44 +252,30 @@ def estimate_confidence(response):
     
     return score
 
+def estimate_confidence(response, response_lower):
+    """Sophisticated confidence estimation based on multiple factors"""
+    if not response:
+        return 35  # Default low-neutral
+    
+    return score_features(extract_features(response, response_lower))
+
 def get_last_assistant_response(transcript_path):
     debug_log(f"Reading transcript from: {transcript_path}")
     try:
-        with open(transcript_path, 'r') as f:
-            lines = f.readlines()
-        
-        debug_log(f"Transcript has {len(lines)} lines")
-        
-        # Find the last assistant message
-        for line in reversed(lines):
+        # Find the last assistant message, scanning from the end of the file
+        for line in iter_lines_reversed(transcript_path):
             try:
-                entry = json.loads(line.strip())
+                entry = json_loads(line)
                 if (entry.get('type') == 'assistant' and 
                     entry.get('message', {}).get('role') == 'assistant'):
                     content = entry.get('message', {}).get('content', '')
                     if content:
                         debug_log("Found assistant response with content")
                         # Handle both string and list formats - always return string
-                        if isinstance(content, list):
-                            # Extract text from list of content blocks
-                            text_parts = []
-                            for block in content:
-                                if isinstance(block, dict) and block.get('type') == 'text':
-                                    text_parts.append(block.get('text', ''))
-                                elif isinstance(block, str):
-                                    text_parts.append(block)
-                            result = '\n'.join(text_parts)
-                            debug_log(f"Extracted text from list content: {len(result)} chars")
-                            return result if result else None
-                        elif isinstance(content, str):
-                            debug_log(f"Found string content: {len(content)} chars")
-                            return content
-                        else:
-                            # Convert any other type to string
-                            result = str(content)
-                            debug_log(f"Converted content to string: {len(result)} chars")
-                            return result
-            except json.JSONDecodeError:
+                        result = extract_text(content)
+                        debug_log(f"Extracted text from content: {len(result)} chars")
+                        return result if result else None
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 continue
         
         debug_log("No valid assistant response found")
@@ -190,11 +284,35 @@ def get_last_assistant_response(transcript_path):
         debug_log(f"Error reading transcript: {str(e)}")
         return None
 
+CONFIG_PATH = os.path.expanduser('~/.claude/clauded-config.json')
+
+@functools.lru_cache(maxsize=1)
+def load_config_file(config_path, mtime_ns):
+    """Parse the config file; cached per modification time so edits are picked up"""
+    with open(config_path, 'rb') as f:
+        return json_loads(f.read())
+
+def get_min_confidence():
+    """Read the minimum confidence threshold from the config file"""
+    # 'clauded confidence N' rewrites this literal in the installed copy
+    min_confidence = 85  # Default fallback
+    try:
+        config = load_config_file(CONFIG_PATH, os.stat(CONFIG_PATH).st_mtime_ns)
+        min_confidence = config.get('minConfidence', 50)
+    except Exception as e:
+        debug_log(f"Could not read config, using default: {str(e)}")
+    return min_confidence
+
+def emit_output(output):
+    """Write the hook's JSON decision straight to the stdout byte stream"""
+    sys.stdout.buffer.write(json_dumps(output) + b'\n')
+    sys.stdout.buffer.flush()
+
 def main():
     debug_log("=== Confidence validator started (UserPromptSubmit) ===")
     try:
         # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        input_data = json_loads(sys.stdin.buffer.read())
         debug_log(f"Received input data: {list(input_data.keys())}")
         
         # Extract user prompt from UserPromptSubmit input
@@ -233,8 +351,7 @@ def main():
             sys.exit(0)
         
         # Check for confidence statement in the required format
-        confidence_pattern = r'confidence:\s*(\d{1,3})%'
-        confidence_match = re.search(confidence_pattern, response.lower())
+        confidence_match = _CONF_RE.search(response)
         
         if confidence_match:
             # Extract explicit confidence percentage
@@ -243,18 +360,13 @@ def main():
         else:
             # Estimate confidence when not explicitly stated
             debug_log("No explicit confidence found, estimating from response characteristics")
-            confidence_pct = estimate_confidence(response)
+            # Bound the work on pathologically long responses
+            scored = response[:MAX_SCORED_CHARS]
+            confidence_pct = estimate_confidence(scored, scored.lower())
             debug_log(f"Estimated confidence: {confidence_pct}%")
         
         # Check minimum confidence threshold (from config)
-        config_path = os.path.expanduser('~/.claude/clauded-config.json')
-        min_confidence = 85  # Default fallback
-        try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                min_confidence = config.get('minConfidence', 50)
-        except Exception as e:
-            debug_log(f"Could not read config, using default: {str(e)}")
+        min_confidence = get_min_confidence()
         
         debug_log(f"Minimum confidence threshold: {min_confidence}%")
         
@@ -268,7 +380,7 @@ def main():
                 "allow_continue": True,
                 "default_action": "block"
             }
-            print(json.dumps(prompt_output))
+            emit_output(prompt_output)
             sys.exit(0)
         
         debug_log(f"Confidence {confidence_pct}% meets threshold, allowing prompt")
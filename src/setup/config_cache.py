@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Shared configuration cache for Claude Code hooks.
+Prevents multiple file reads of the same config across hook executions.
+"""
+
+import atexit
+import os
+import json
+import time
+
+# orjson parses several times faster than the stdlib; fall back when it isn't installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Global cache, keyed on the config file's modification time
+_config_cache = {
+    'data': None,
+    'mtime': None
+}
+
+CONFIG_PATH = os.path.expanduser('~/.claude/clauded-config.json')
+
+DEBUG_LOG = os.path.expanduser("~/.claude/clauded-debug.log")
+
+# Debug logging is opt-in so normal hook runs pay nothing for it
+DEBUG_ENABLED = os.environ.get('CLAUDED_DEBUG') == '1'
+
+if DEBUG_ENABLED:
+    # Opened on first use and reused for the life of the hook process
+    _debug_file = None
+
+    def debug_log(message, *args):
+        global _debug_file
+        if _debug_file is None:
+            try:
+                _debug_file = open(DEBUG_LOG, 'a', buffering=1)  # Line-buffered
+                atexit.register(_debug_file.close)
+            except Exception:
+                _debug_file = False  # Don't retry if we can't write to debug log
+        if not _debug_file:
+            return
+        # Arguments are only formatted once we know the line will be written
+        if args:
+            try:
+                message = message % args
+            except Exception:
+                pass  # Log the unformatted message rather than nothing
+        try:
+            timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+            _debug_file.write(f"[CONFIG-CACHE {timestamp}] {message}\n")
+        except Exception:
+            pass
+else:
+    def debug_log(message, *args):
+        pass
+
+def get_cached_config():
+    """Get configuration, re-reading the file only when its modification time changes"""
+    # Each hook run is a fresh process, so a wall-clock TTL never helped; a stat
+    # tells us exactly when the file on disk differs from what we cached
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
+        mtime = None  # No readable config, defaults apply
+    
+    # Check if cache is valid
+    if _config_cache['data'] is not None and _config_cache['mtime'] == mtime:
+        debug_log("Using cached config")
+        return _config_cache['data']
+    
+    # Cache miss or file changed, read from file
+    default_config = {
+        'minConfidence': 50, 
+        'verbose': True,
+        'lastUpdated': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    
+    try:
+        debug_log("Reading config from %s", CONFIG_PATH)
+        with open(CONFIG_PATH, 'rb') as f:
+            config = json_loads(f.read())
+            
+        # Ensure all required keys exist
+        for key, default_value in default_config.items():
+            if key not in config:
+                config[key] = default_value
+        
+        debug_log("Config loaded and cached: minConfidence=%s, verbose=%s", config.get('minConfidence'), config.get('verbose'))
+        
+    except FileNotFoundError:
+        debug_log("Config file not found, using defaults")
+        config = default_config
+        
+    except json.JSONDecodeError as e:
+        debug_log("Config file corrupted, using defaults: %s", e)
+        config = default_config
+        
+    except Exception as e:
+        debug_log("Error reading config, using defaults: %s", e)
+        config = default_config
+    
+    # Update cache
+    _config_cache['data'] = config
+    _config_cache['mtime'] = mtime
+    return config
+
+def invalidate_cache():
+    """Invalidate the config cache (useful after config updates)"""
+    debug_log("Cache invalidated")
+    _config_cache['data'] = None
+    _config_cache['mtime'] = None
+
+def get_cache_stats():
+    """Get cache statistics for debugging"""
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    
+    return {
+        'cached': _config_cache['data'] is not None,
+        'valid': _config_cache['data'] is not None and _config_cache['mtime'] == mtime,
+        'mtime_ns': _config_cache['mtime']
+    }
+
+# Convenience functions for common config values
+def get_min_confidence():
+    """Get minimum confidence threshold"""
+    config = get_cached_config()
+    return config.get('minConfidence', 50)
+
+def get_verbose_mode():
+    """Get verbose mode setting"""
+    config = get_cached_config()
+    return config.get('verbose', True)
+
+def is_high_confidence_required():
+    """Check if high confidence is required (threshold > 80)"""
+    return get_min_confidence() > 80
\ No newline at end of file
@@ -91,6 +91,7 @@ export async function installClaudedSystem(config) {
     await ensureDirectories();
     
     // Install unified hooks (consolidates 4 hooks into 2 for better performance)
+    await installTextFeatures(config);
     await installUnifiedPromptHook(config);
     await installUnifiedPostToolHook(config);
     
@@ -142,7 +143,7 @@ async function ensureDirectories() {
 
 async function installUnifiedPromptHook(config) {
   const hookPath = path.join(CLAUDED_DIR, 'hooks', 'confidence-unified-prompt.py');
-  const configCachePath = path.join(CLAUDED_DIR, 'hooks', 'config-cache.py');
+  const configCachePath = path.join(CLAUDED_DIR, 'hooks', 'config_cache.py');
   
   // Determine source paths based on installation mode
   let sourcePath, configCacheSource;
@@ -150,11 +151,11 @@ async function installUnifiedPromptHook(config) {
   if (config.npmPackageRoot) {
     // Production mode: use npmPackageRoot
     sourcePath = path.join(config.npmPackageRoot, 'src/setup', 'confidence-unified-prompt.py');
-    configCacheSource = path.join(config.npmPackageRoot, 'src/setup', 'config-cache.py');
+    configCacheSource = path.join(config.npmPackageRoot, 'src/setup', 'config_cache.py');
   } else {
     // Development mode: use current script location
     sourcePath = path.join(path.dirname(new URL(import.meta.url).pathname), 'confidence-unified-prompt.py');
-    configCacheSource = path.join(path.dirname(new URL(import.meta.url).pathname), 'config-cache.py');
+    configCacheSource = path.join(path.dirname(new URL(import.meta.url).pathname), 'config_cache.py');
   }
   
   try {
@@ -182,6 +183,40 @@ async function installUnifiedPromptHook(config) {
   }
 }
 
+// Both unified hooks import text_features.py, so it is installed once for them
+async function installTextFeatures(config) {
+  const modulePath = path.join(CLAUDED_DIR, 'hooks', 'text_features.py');
+  
+  // Determine source path based on installation mode
+  let sourcePath;
+  
+  if (config.npmPackageRoot) {
+    // Production mode: use npmPackageRoot
+    sourcePath = path.join(config.npmPackageRoot, 'src/setup', 'text_features.py');
+  } else {
+    // Development mode: use current script location
+    sourcePath = path.join(path.dirname(new URL(import.meta.url).pathname), 'text_features.py');
+  }
+  
+  try {
+    if (config.isDevelopment) {
+      // Development mode: create symlink for easier testing
+      try {
+        await fs.unlink(modulePath);
+      } catch (e) {
+        // File doesn't exist, that's ok
+      }
+      await fs.symlink(sourcePath, modulePath);
+    } else {
+      // Production mode: copy file
+      await fs.copyFile(sourcePath, modulePath);
+      await fs.chmod(modulePath, 0o755); // Make executable
+    }
+  } catch (error) {
+    throw new Error(`Failed to install shared hook module: ${error.message}`);
+  }
+}
+
 async function installUnifiedPostToolHook(config) {
   const hookPath = path.join(CLAUDED_DIR, 'hooks', 'confidence-unified-posttool.py');
   
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Shared transcript reading and response text analysis for the hooks.
+Builds the keyword matcher once so each response is scanned in a single pass.
+"""
+
+import functools
+import os
+import re
+from collections import namedtuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+HIGH_RISK_KEYWORDS = [
+    'delete', 'remove', 'rm ', 'unlink', 'drop', 'truncate',
+    'format', 'wipe', 'destroy', 'kill', 'terminate',
+    'sudo', 'chmod', 'chown', 'mv ', 'move'
+]
+
+MEDIUM_RISK_KEYWORDS = [
+    'edit', 'modify', 'change', 'update', 'replace',
+    'install', 'config', 'settings', 'deploy'
+]
+
+# Language indicators used for confidence estimation
+SUCCESS_WORDS = ['successfully', 'completed', 'working', 'fixed']
+UNCERTAINTY_WORDS = ['might', 'maybe', 'possibly', 'not sure']
+
+# Broader language indicators reported in the verbose analysis
+ANALYSIS_UNCERTAINTY_WORDS = ['might', 'maybe', 'possibly', 'not sure', 'unclear', 'probably']
+ANALYSIS_SUCCESS_WORDS = ['successfully', 'completed', 'working', 'fixed', 'done', 'finished']
+
+# Only what analyze() and its callers read
+KEYWORD_CATEGORIES = {
+    'high_risk': HIGH_RISK_KEYWORDS,
+    'medium_risk': MEDIUM_RISK_KEYWORDS,
+    'success': SUCCESS_WORDS,
+    'uncertainty': UNCERTAINTY_WORDS,
+    'analysis_success': ANALYSIS_SUCCESS_WORDS,
+    'analysis_uncertainty': ANALYSIS_UNCERTAINTY_WORDS
+}
+
+AnalysisResult = namedtuple('AnalysisResult', ['keywords', 'risk_level'])
+
+def build_keyword_matcher(keywords_by_category, ignore_case=False):
+    """Build a single-pass matcher yielding (keyword, categories) for every keyword hit.
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise a
+    lookahead alternation regex so overlapping keywords are still reported.
+    With ignore_case the keywords must be lower-case ASCII and callers can pass
+    the original text rather than a lower-cased copy.
+    """
+    categories_by_keyword = {}
+    for category, keywords in keywords_by_category.items():
+        for keyword in keywords:
+            categories_by_keyword.setdefault(keyword, []).append(category)
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, categories in categories_by_keyword.items():
+            automaton.add_word(keyword, (keyword, categories))
+        automaton.make_automaton()
+        if ignore_case:
+            # The automaton is case-sensitive, so it has to scan a lower-cased copy
+            return lambda text: (value for _, value in automaton.iter(text.lower()))
+        return lambda text: (value for _, value in automaton.iter(text))
+    
+    # Alternatives are tried longest first, so each match is the longest keyword at
+    # its position; any keywords that are prefixes of it matched there as well
+    keywords = sorted(categories_by_keyword, key=len, reverse=True)
+    hits = {k: [(p, categories_by_keyword[p]) for p in keywords if k.startswith(p)] for k in keywords}
+    alternation = '(?=(' + '|'.join(map(re.escape, keywords)) + '))'
+    if ignore_case:
+        # Matching case-insensitively avoids copying the whole text; ASCII folding
+        # keeps every match lower-casing back to exactly one of the keywords
+        pattern = re.compile(alternation, re.IGNORECASE | re.ASCII)
+        return lambda text: (hit for m in pattern.finditer(text) for hit in hits[m.group(1).lower()])
+    pattern = re.compile(alternation)
+    return lambda text: (hit for m in pattern.finditer(text) for hit in hits[m.group(1)])
+
+# Built on first use, so hooks that only import the transcript reader don't pay for it
+@functools.lru_cache(maxsize=1)
+def _keyword_matcher():
+    return build_keyword_matcher(KEYWORD_CATEGORIES)
+
+def group_keyword_hits(hits, categories):
+    """Collect matcher hits into the distinct keywords found per category"""
+    found = {category: set() for category in categories}
+    for keyword, hit_categories in hits:
+        for category in hit_categories:
+            found[category].add(keyword)
+    return found
+
+def scan_keywords(text_lower):
+    """Return the distinct keywords found in lower-cased text, grouped by category"""
+    return group_keyword_hits(_keyword_matcher()(text_lower), KEYWORD_CATEGORIES)
+
+def analyze(text_lower, tool_calls_len):
+    """Scan lower-cased response text once and derive the flags the hooks act on"""
+    found = scan_keywords(text_lower)
+    
+    if found['high_risk']:
+        risk_level = 'high'
+    elif found['medium_risk'] or tool_calls_len > 3:  # Many tool calls = higher risk
+        risk_level = 'medium'
+    else:
+        risk_level = 'low'
+    
+    return AnalysisResult(
+        keywords=found,
+        risk_level=risk_level
+    )
+
+def extract_text(content):
+    """Flatten message content to a string, keeping only the text blocks"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        # Most messages are a single block, so skip the generator and join for those
+        if len(content) == 1:
+            block = content[0]
+            if isinstance(block, str):
+                return block
+            return block.get('text', '') if isinstance(block, dict) and block.get('type') == 'text' else ''
+        return '\n'.join(
+            block if isinstance(block, str) else block.get('text', '')
+            for block in content
+            if isinstance(block, str) or (isinstance(block, dict) and block.get('type') == 'text')
+        )
+    return str(content)
+
+def estimate_tokens(text):
+    """Rough token count for the verbose display, at about 4 characters per token"""
+    return max(1, len(text) // 4)
+
+# Transcripts are read backward from EOF in blocks of this size
+TAIL_CHUNK_SIZE = 65536
+
+def iter_lines_reversed(transcript_path):
+    """Yield transcript lines as bytes, last line first, without loading the whole file"""
+    with open(transcript_path, 'rb') as f:
+        offset = f.seek(0, os.SEEK_END)
+        # Pieces of the line that runs into earlier blocks, last piece first; they are
+        # joined once the line is complete so a long line is never copied per block
+        pending = []
+        while offset > 0:
+            size = min(TAIL_CHUNK_SIZE, offset)
+            offset -= size
+            f.seek(offset)
+            block = f.read(size)
+            cut = block.rfind(b'\n')
+            if cut < 0:
+                pending.append(block)
+                continue
+            pending.append(block[cut + 1:])
+            line = b''.join(reversed(pending))
+            if line.strip():
+                yield line
+            lines = block[:cut].split(b'\n')
+            # The first piece may continue in the previous block
+            pending = [lines.pop(0)]
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        line = b''.join(reversed(pending))
+        if line.strip():
+            yield line
@@ -0,0 +1,73 @@
+#!/usr/bin/env node
+
+import { spawnSync } from 'child_process';
+import { existsSync, mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+
+console.log('🧪 Testing hook installation into a fresh home directory...\n');
+
+// The installer resolves ~/.claude when it is imported, so each install runs in
+// its own node process with HOME pointed at a scratch directory
+const installScript = `
+import { installClauded } from './src/setup/installer.js';
+await installClauded(JSON.parse(process.argv[1]));
+`;
+
+const installedFiles = [
+  'confidence-unified-prompt.py',
+  'confidence-unified-posttool.py',
+  'config_cache.py',
+  'text_features.py'
+];
+
+const modes = [
+  { name: 'development (symlinks)', options: {} },
+  { name: 'production (copies)', options: { npmPackageRoot: process.cwd() } }
+];
+
+let failed = false;
+
+for (const mode of modes) {
+  console.log(`📋 Running test: ${mode.name}`);
+  const home = mkdtempSync(join(tmpdir(), 'clauded-install-'));
+  const env = { ...process.env, HOME: home };
+  const hooksDir = join(home, '.claude', 'clauded', 'hooks');
+
+  try {
+    // Install twice: once fresh, once over the files the first run left behind
+    for (const run of ['fresh install', 'reinstall']) {
+      const result = spawnSync('node', ['--input-type=module', '-e', installScript, JSON.stringify(mode.options)], { encoding: 'utf8', env });
+      if (result.status !== 0 || result.stdout.includes('Installation failed')) {
+        throw new Error(`${run} failed:\n${result.stdout}${result.stderr}`);
+      }
+
+      const missing = installedFiles.filter(file => !existsSync(join(hooksDir, file)));
+      if (missing.length > 0) {
+        throw new Error(`${run} is missing ${missing.join(', ')}`);
+      }
+    }
+
+    // The installed hooks must be able to import their shared modules
+    for (const hook of ['confidence-unified-prompt.py', 'confidence-unified-posttool.py']) {
+      const result = spawnSync('python3', [join(hooksDir, hook)], { input: '{"transcript_path": "/nonexistent"}', encoding: 'utf8', env });
+      if (result.status !== 0) {
+        throw new Error(`${hook} exited with ${result.status}: ${result.stderr.trim()}`);
+      }
+    }
+
+    console.log('   ✅ Installed and reinstalled cleanly');
+  } catch (error) {
+    console.log(`   ❌ ${error.message}`);
+    failed = true;
+  } finally {
+    rmSync(home, { recursive: true, force: true });
+  }
+}
+
+if (failed) {
+  console.error('\n❌ Fresh install tests failed');
+  process.exit(1);
+}
+
+console.log('\n✅ All tests completed!');
@@ -0,0 +1,53 @@
+#!/usr/bin/env node
+
+import { spawnSync } from 'child_process';
+
+console.log('🧪 Testing confidence scorer tool risk classification...\n');
+
+const hookPath = './src/setup/confidence-scorer.py';
+
+// A tool reported in tool_calls and the same tool reported as tool_name must get
+// the same decision; MCP tools are prefixed with mcp__<server>__
+const cases = [
+  { tool: 'mcp__fs__write_file', decision: 'block' },
+  { tool: 'mcp__x__delete_file', decision: 'block' },
+  { tool: 'Edit', decision: 'block' },
+  { tool: 'mcp__fs__read_file', decision: 'approve' }
+];
+
+function runScorer(payload) {
+  const result = spawnSync('python3', [hookPath], { input: JSON.stringify(payload), encoding: 'utf8' });
+  return JSON.parse(result.stdout).decision;
+}
+
+let failed = false;
+
+for (const { tool, decision } of cases) {
+  console.log(`📋 Running test: ${tool}`);
+  const fromToolCalls = runScorer({ response: { content: 'Done.' }, tool_calls: [{ function: { name: tool } }] });
+  const fromToolName = runScorer({ tool_name: tool });
+
+  if (fromToolCalls === decision && fromToolName === decision) {
+    console.log(`   ✅ ${decision} from both tool_calls and tool_name`);
+  } else {
+    console.log(`   ❌ Expected ${decision}, got ${fromToolCalls} from tool_calls and ${fromToolName} from tool_name`);
+    failed = true;
+  }
+}
+
+// Exact word matching keeps a name that merely contains 'write' out of the high-risk set
+console.log('📋 Running test: todowrite');
+const todoDecision = runScorer({ response: { content: 'Done.' }, tool_calls: [{ function: { name: 'todowrite' } }] });
+if (todoDecision === 'approve') {
+  console.log('   ✅ approve from tool_calls');
+} else {
+  console.log(`   ❌ Expected approve, got ${todoDecision}`);
+  failed = true;
+}
+
+if (failed) {
+  console.error('\n❌ Scorer tool risk tests failed');
+  process.exit(1);
+}
+
+console.log('\n✅ All tests completed!');
@@ -0,0 +1,80 @@
+#!/usr/bin/env node
+
+import { spawnSync } from 'child_process';
+
+console.log('🧪 Testing backward transcript reader...\n');
+
+// Every hook that reads transcripts imports iter_lines_reversed from text_features
+const hookPaths = [
+  './src/setup/text_features.py'
+];
+
+// Loads a hook by path and checks its reader against a plain forward split:
+// random files read with tiny block sizes, then a transcript whose last line
+// is one 20 MB tool result written after the assistant entry
+const checkScript = `
+import importlib.util, json, os, random, sys, tempfile, time
+
+spec = importlib.util.spec_from_file_location('hook', sys.argv[1])
+hook = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(hook)
+block_size = hook.TAIL_CHUNK_SIZE
+
+fd, path = tempfile.mkstemp(suffix='.jsonl')
+os.close(fd)
+try:
+    random.seed(0)
+    for _ in range(500):
+        pieces = [random.choice([b'', b' ', b'a' * random.randint(1, 40)]) for _ in range(random.randint(0, 12))]
+        data = b'\\n'.join(pieces) + random.choice([b'', b'\\n'])
+        with open(path, 'wb') as f:
+            f.write(data)
+        hook.TAIL_CHUNK_SIZE = random.randint(1, 16)
+        expected = [line for line in reversed(data.split(b'\\n')) if line.strip()]
+        got = list(hook.iter_lines_reversed(path))
+        if got != expected:
+            sys.exit(f'mismatch for {data!r} with block size {hook.TAIL_CHUNK_SIZE}: {got!r}')
+    hook.TAIL_CHUNK_SIZE = block_size
+
+    assistant = {'type': 'assistant', 'message': {'role': 'assistant', 'content': 'Fixed it.'}}
+    tool_result = {'type': 'user', 'message': {'role': 'user', 'content': 'x' * (20 * 1024 * 1024)}}
+    with open(path, 'w') as f:
+        f.write(json.dumps(assistant) + '\\n' + json.dumps(tool_result) + '\\n')
+
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        f.readlines()
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lines = list(hook.iter_lines_reversed(path))
+    elapsed = time.perf_counter() - start
+    if json.loads(lines[-1]) != assistant:
+        sys.exit('assistant entry not read back intact')
+    # Copying the pending line on every block made this take seconds
+    if elapsed > max(0.5, 5 * baseline):
+        sys.exit(f'20 MB line took {elapsed:.3f}s (readlines: {baseline:.3f}s)')
+    print(f'{elapsed * 1000:.0f}ms for a 20 MB line (readlines: {baseline * 1000:.0f}ms)')
+finally:
+    os.remove(path)
+`;
+
+let failed = false;
+
+for (const hookPath of hookPaths) {
+  console.log(`📋 Running test: ${hookPath}`);
+  const result = spawnSync('python3', ['-c', checkScript, hookPath], { encoding: 'utf8' });
+  if (result.status === 0) {
+    console.log(`   ✅ ${result.stdout.trim()}`);
+  } else {
+    console.log(`   ❌ ${(result.stderr || result.stdout).trim()}`);
+    failed = true;
+  }
+}
+
+if (failed) {
+  console.error('\n❌ Transcript reader tests failed');
+  process.exit(1);
+}
+
+console.log('\n✅ All tests completed!');